@@ -7,15 +7,31 @@ import os
 
 migrate = Migrate()
 
-from control import core
+from control.process import RemoteStreamManager
+from control.streams import StreamManager, parse_streams
 
-core_service = core.DroneCoreService(
-    mavlink_address=os.getenv("mavlink_address", "udp:0.0.0.0:14550"),
-    stream_host=os.getenv("camera_host", "192.168.0.107"),
-    stream_port=os.getenv("camera_port", 5588),
-    model_path=os.getenv("model_path", "control/analysis/yolov8n-visdrone.pt"),
-    dem_path=os.getenv("dem_path", "control/analysis/S36E149.hgt")
-)
+
+def create_stream_manager():
+    # built from create_app so spawned analysis workers can re-import __main__ without starting another worker
+    execution = os.getenv("execution", "thread")
+
+    return (RemoteStreamManager if execution == "process" else StreamManager)(
+        streams=parse_streams(os.getenv("streams"), {
+            "mavlink_address": os.getenv("mavlink_address", "udp:0.0.0.0:14550"),
+            "stream_host": os.getenv("camera_host", "192.168.0.107"),
+            "stream_port": os.getenv("camera_port", 5588),
+            "stream_format": os.getenv("stream_format", "json"),
+            "stream_mode": os.getenv("stream_mode", "request")
+        }),
+        model_path=os.getenv("model_path", "control/analysis/yolov8n-visdrone.pt"),
+        dem_path=os.getenv("dem_path", "control/analysis/S36E149.hgt"),
+        inference_backend=os.getenv("inference_backend", "ultralytics"),
+        inference_size=int(os.getenv("inference_size", 640)),
+        inference_threads=int(os.getenv("inference_threads", 0)) or None,
+        reid_reuse_iou=float(os.getenv("reid_reuse_iou", 0)) or None,
+        dem_cache_size=int(os.getenv("dem_cache_size", 64 * 1024 * 1024)),
+        dem_tolerance=float(os.getenv("dem_tolerance", 0.1))
+    )
 
 
 def create_app():
@@ -37,6 +53,21 @@ def create_app():
     app.register_blueprint(profile_bp, url_prefix='/profile')
     app.register_blueprint(settings_bp, url_prefix='/settings')
 
+    from storage import AnalysisWriter, SegmentStore
+    from utils.live import create_live_feeds
+
+    app.stream_manager = stream_manager = create_stream_manager()
+    app.live_feeds = create_live_feeds(stream_manager)
+
+    app.segment_store = SegmentStore(app.config['SEGMENT_DIRECTORY'])
+    app.analysis_writer = AnalysisWriter(
+        app, stream_manager,
+        segment_store=app.segment_store,
+        flush_interval=float(os.getenv("writer_flush_interval", 1.0)),
+        flush_count=int(os.getenv("writer_flush_count", 32))
+    )
+    app.analysis_writer.start()
+
     return app
 
 
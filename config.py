@@ -4,3 +4,4 @@ class Config:
     SECRET_KEY = os.urandom(24)
     SQLALCHEMY_DATABASE_URI = 'sqlite:///app.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SEGMENT_DIRECTORY = os.getenv('segment_directory', 'segments')
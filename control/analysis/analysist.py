@@ -1,63 +1,84 @@
 import math
-from ultralytics import YOLO
+
+import numpy
 from .deep_sort.deep_sort.tracker import Tracker
 from .deep_sort.deep_sort.deep.extractor import Extractor
 from .deep_sort.deep_sort.deep.configuration import ResNetConfiguration
 from .deep_sort.deep_sort.deep.weights import RESNET18_WEIGHTS
 from .geospatial import GEOSpatial
+from .inference import create_backend
+from .reid import BatchedExtractor
+
+
+def create_extractor(batch_size=32):
+    resnet = ResNetConfiguration(
+        base="resnet18",
+        weights_path=RESNET18_WEIGHTS,
+        use_cuda=False
+    )
+    return Extractor(model=resnet, batch_size=batch_size)
 
 
 class DroneAnalysisService:
-    def __init__(self, model_path, dem_path, classes=None, detection_threshold=0.25, iou_threshold=0.5, max_detections=10):
-        self.model = YOLO(model_path)
+    def __init__(self, model_path, dem_path, classes=None, detection_threshold=0.25, iou_threshold=0.5, max_detections=10,
+                 backend="ultralytics", input_size=640, threads=None, warmup=1,
+                 reid_batch_size=32, reid_reuse_iou=None, dem_cache_size=64 * 1024 * 1024, dem_tolerance=0.1,
+                 model=None, reid_extractor=None):
+        if model is None:
+            model = create_backend(backend, model_path, input_size=input_size, threads=threads, warmup=warmup)
+        self.model = model
         self.detection_threshold = detection_threshold
         self.iou_threshold = iou_threshold
         self.max_detections = max_detections
         self.classes = classes
 
-        resnet = ResNetConfiguration(
-            base="resnet18",
-            weights_path=RESNET18_WEIGHTS,
-            use_cuda=False
+        if reid_extractor is None:
+            reid_extractor = create_extractor(reid_batch_size)
+        self.extractor = BatchedExtractor(
+            reid_extractor,
+            max_batch_size=reid_batch_size,
+            reuse_iou=reid_reuse_iou
         )
-        self.extractor = Extractor(model=resnet, batch_size=4)
         self.tracker = Tracker(
             feature_extractor=self.extractor,
             max_iou_distance=0.7,
             max_cosine_distance=0.7
         )
+        self.stable = False
 
-        self.geospatial = GEOSpatial(dem_path)
+        self.geospatial = GEOSpatial(dem_path, tolerance=dem_tolerance, cache_size=dem_cache_size)
 
     def predict(self, frame):
-        result = self.model.predict(
-            source=frame,
-            imgsz=frame.shape[:2],
+        return self.model.predict(
+            frame,
             classes=self.classes,
             conf=self.detection_threshold,
             iou=self.iou_threshold,
-            max_det=self.max_detections,
-            augment=False,
-            agnostic_nms=True,
-            device="cpu",
-            half=False,
-            verbose=False
-        )[0]
-
-        detections = []
-        for res in result.boxes.data.tolist():
-            x1, y1, x2, y2, score, class_id = res
-            x1, x2, y1, y2 = map(int, (x1, x2, y1, y2))
-            class_id = int(class_id)
-            detections.append([x1, y1, x2, y2, score, class_id])
-
-        return detections
+            max_det=self.max_detections
+        )
 
     def update_tracker(self, frame, detections):
+        self.extractor.prime(detections)
         self.tracker.update(frame, detections)
+        self.extractor.remember(self.tracker.tracks)
+        self.update_stable()
 
         return self.tracker.tracks
 
+    def propagate_tracker(self):
+        self.tracker.predict()
+        self.update_stable()
+
+        return self.tracker.tracks
+
+    def update_stable(self):
+        # computed on the track stage thread; the detect stage only reads the flag
+        tracks = self.tracker.tracks
+        self.stable = bool(tracks) and not any(track.is_tentative() for track in tracks)
+
+    def tracks_stable(self):
+        return self.stable
+
     def geospatial_analysis(self, tracks, image_width, image_height, fov_horizontal, fov_vertical, gimbal_data, attitude_data, global_position_data):
         gimbal_roll, gimbal_pitch, gimbal_yaw = gimbal_data.quaternion.to_euler()
         drone_roll = math.radians(attitude_data.roll)
@@ -68,26 +89,28 @@ class DroneAnalysisService:
         view_pitch = gimbal_pitch + drone_pitch
         view_yaw = gimbal_yaw + drone_heading
 
-        tracks_locations = {}
-        for track in tracks:
-            x1, y1, x2, y2 = track.to_tlbr()
-            track_id = track.track_id
-
-            detection_offset = self.geospatial.detection_angles(
-                self.geospatial.find_center(x1, y1, x2, y2),
-                (image_width, image_height),
-                fov_horizontal,
-                fov_vertical
-            )
-            direction_vector = self.geospatial.calculate_direction_vector(
-                (view_roll, view_pitch, view_yaw),
-                detection_offset
-            )
-            target_location = self.geospatial.find_target_location(
-                global_position_data,
-                direction_vector
-            )
-
-            tracks_locations[track_id] = target_location
+        if not tracks:
+            return {}
+
+        boxes = numpy.array([track.to_tlbr() for track in tracks])
+
+        detection_offsets = self.geospatial.detection_angles(
+            self.geospatial.find_center(boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]),
+            (image_width, image_height),
+            fov_horizontal,
+            fov_vertical
+        )
+        direction_vectors = self.geospatial.calculate_direction_vector(
+            (view_roll, view_pitch, view_yaw),
+            detection_offsets
+        )
+        target_locations = self.geospatial.find_target_locations(
+            global_position_data,
+            direction_vectors
+        )
+
+        tracks_locations = {
+            track.track_id: target_location for track, target_location in zip(tracks, target_locations)
+        }
 
         return tracks_locations
@@ -1,57 +1,213 @@
 import math
+from collections import OrderedDict
+
 import numpy
 import rasterio
-from rasterio.enums import Resampling
+from rasterio.crs import CRS
 from rasterio.warp import transform
+from rasterio.windows import Window
+
+
+def block_max(array, size):
+    rows = -(-array.shape[0] // size) * size
+    cols = -(-array.shape[1] // size) * size
+
+    padded = numpy.full((rows, cols), -numpy.inf, dtype=numpy.float32)
+    padded[:array.shape[0], :array.shape[1]] = array
+
+    return padded.reshape(rows // size, size, cols // size, size).max(axis=(1, 3))
+
+
+class ElevationTileCache:
+    def __init__(self, src, tile_size=256, max_bytes=64 * 1024 * 1024):
+        self.src = src
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+
+        self.tiles = OrderedDict()
+        self.size_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_tile(self, tile_row, tile_col):
+        key = (tile_row, tile_col)
+
+        if key in self.tiles:
+            self.hits += 1
+            self.tiles.move_to_end(key)
+            return self.tiles[key]
+
+        self.misses += 1
+
+        row_offset = tile_row * self.tile_size
+        col_offset = tile_col * self.tile_size
+        tile = self.src.read(
+            1,
+            window=Window(
+                col_offset, row_offset,
+                min(self.tile_size, self.src.width - col_offset),
+                min(self.tile_size, self.src.height - row_offset)
+            )
+        )
+
+        self.tiles[key] = tile
+        self.size_bytes += tile.nbytes
+
+        while self.size_bytes > self.max_bytes and len(self.tiles) > 1:
+            _, evicted_tile = self.tiles.popitem(last=False)
+            self.size_bytes -= evicted_tile.nbytes
+            self.evictions += 1
+
+        return tile
+
+    def __getitem__(self, index):
+        rows, cols = numpy.asarray(index[0]), numpy.asarray(index[1])
+
+        tile_rows = rows // self.tile_size
+        tile_cols = cols // self.tile_size
+
+        values = numpy.empty(rows.shape, dtype=self.src.dtypes[0])
+        for tile_row, tile_col in set(zip(tile_rows.ravel().tolist(), tile_cols.ravel().tolist())):
+            mask = (tile_rows == tile_row) & (tile_cols == tile_col)
+            tile = self.get_tile(tile_row, tile_col)
+            values[mask] = tile[
+                rows[mask] - tile_row * self.tile_size,
+                cols[mask] - tile_col * self.tile_size
+            ]
+
+        return values
+
+    def info(self):
+        return {
+            "mode": "tiled",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "tiles": len(self.tiles),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes
+        }
 
 
 class GEOSpatial:
-    def __init__(self, file_path):
+    def __init__(self, file_path, tolerance=0.1, coarse_step=1.0, max_distance=1000, cache_size=64 * 1024 * 1024, pyramid_base=2):
         self.file_path = file_path
         self.src = rasterio.open(self.file_path)
-        self.resolution = self._estimate_resolution()
 
-        self.elevation_cache = {}
+        self.tolerance = tolerance
+        self.coarse_step = coarse_step
+        self.max_distance = max_distance
+        self.cache_size = cache_size
+        self.pyramid_base = pyramid_base
+
+        self.geographic = self.src.crs == CRS.from_epsg(4326)
+        self.inverse_transform = ~self.src.transform
+        self.elevation_data = self._load_elevation()
+        self.lookups = 0
+
+        self.pyramid = self._build_pyramid()
+        self.pyramid_sizes = [2 ** (self.pyramid_base + level) for level in range(len(self.pyramid))]
+        self.pyramid_cells = numpy.concatenate([level.ravel() for level in self.pyramid])
+        self.pyramid_offsets = numpy.cumsum([0] + [level.size for level in self.pyramid[:-1]])
+        self.pyramid_widths = numpy.array([level.shape[1] for level in self.pyramid])
+
+    def _load_elevation(self):
+        if self.src.driver == "SRTMHGT":
+            return numpy.memmap(self.file_path, dtype=">i2", mode="r", shape=(self.src.height, self.src.width))
+
+        band_size = self.src.height * self.src.width * numpy.dtype(self.src.dtypes[0]).itemsize
+        if band_size > self.cache_size:
+            return ElevationTileCache(self.src, max_bytes=self.cache_size)
+
+        return self.src.read(1)
+
+    def _read_rows(self, row_start, row_stop):
+        if isinstance(self.elevation_data, ElevationTileCache):
+            return self.src.read(1, window=Window(0, row_start, self.src.width, row_stop - row_start))
+
+        return numpy.asarray(self.elevation_data[row_start:row_stop])
+
+    def _build_pyramid(self):
+        size = 2 ** self.pyramid_base
+        chunk_rows = size * max(1, 256 // size)
+
+        blocks = []
+        for row in range(0, self.src.height - 1, chunk_rows):
+            pixels = self._read_rows(row, min(row + chunk_rows + 1, self.src.height)).astype(numpy.float32)
+            cells = numpy.maximum(
+                numpy.maximum(pixels[:-1, :-1], pixels[1:, :-1]),
+                numpy.maximum(pixels[:-1, 1:], pixels[1:, 1:])
+            )
+            blocks.append(block_max(cells, size))
+
+        pyramid = [numpy.concatenate(blocks)]
+        while pyramid[-1].shape != (1, 1):
+            pyramid.append(block_max(pyramid[-1], 2))
+
+        return pyramid
+
+    def cache_info(self):
+        if isinstance(self.elevation_data, ElevationTileCache):
+            return {**self.elevation_data.info(), "lookups": self.lookups}
 
-    def _estimate_resolution(self):
-        latitude_resolution = (self.src.bounds.top - self.src.bounds.bottom) / self.src.height
-        longitude_resolution = (self.src.bounds.right - self.src.bounds.left) / self.src.width
+        return {
+            "mode": "memmap" if isinstance(self.elevation_data, numpy.memmap) else "resident",
+            "lookups": self.lookups,
+            "size_bytes": self.elevation_data.nbytes
+        }
 
-        return max(latitude_resolution, longitude_resolution)
+    def pixel_coordinates(self, latitudes, longitudes):
+        xs = numpy.asarray(longitudes, dtype=float)
+        ys = numpy.asarray(latitudes, dtype=float)
 
-    def round_location(self, latitude, longitude):
-        decimal_places = -int(math.floor(math.log10(self.resolution)))
+        if not self.geographic:
+            transformed_xs, transformed_ys = transform(CRS.from_epsg(4326), self.src.crs, xs.ravel(), ys.ravel())
+            xs = numpy.reshape(transformed_xs, xs.shape)
+            ys = numpy.reshape(transformed_ys, ys.shape)
 
-        latitude_round = round(round(latitude / self.resolution) * self.resolution, decimal_places)
-        longitude_round = round(round(longitude / self.resolution) * self.resolution, decimal_places)
+        cols, rows = self.inverse_transform * (xs, ys)
 
-        return latitude_round, longitude_round
+        return rows, cols
+
+    def pixel_index(self, latitudes, longitudes):
+        rows, cols = self.pixel_coordinates(latitudes, longitudes)
+
+        return numpy.floor(rows).astype(int), numpy.floor(cols).astype(int)
 
     def find_elevation(self, latitude, longitude):
-        latitude_key, longitude_key = self.round_location(latitude, longitude)
+        rows, cols = self.pixel_index(latitude, longitude)
 
-        if (latitude_key, longitude_key) in self.elevation_cache:
-            return self.elevation_cache[(latitude_key, longitude_key)]
+        inside = (rows >= 0) & (rows < self.src.height) & (cols >= 0) & (cols < self.src.width)
 
-        transformed_point = transform(
-            {"init": "epsg:4326"},
-            self.src.crs,
-            [longitude], [latitude]
-        )
+        elevations = numpy.full(rows.shape, numpy.nan)
+        elevations[inside] = self.elevation_data[rows[inside], cols[inside]]
+        self.lookups += int(numpy.count_nonzero(inside))
 
-        row, col = self.src.index(transformed_point[0][0], transformed_point[1][0])
+        if elevations.ndim == 0:
+            return float(elevations)
 
-        elevation = self.src.read(
-            1,
-            window=rasterio.windows.Window(col, row, 1, 1),
-            resampling=Resampling.nearest
-        )
+        return elevations
 
-        elevation_value = elevation[0][0]
+    def interpolate_elevation(self, grid_rows, grid_cols):
+        rows = numpy.minimum(numpy.maximum(numpy.floor(grid_rows).astype(int), 0), self.src.height - 2)
+        cols = numpy.minimum(numpy.maximum(numpy.floor(grid_cols).astype(int), 0), self.src.width - 2)
 
-        self.elevation_cache[(latitude_key, longitude_key)] = elevation_value
+        row_weights = grid_rows - rows
+        col_weights = grid_cols - cols
+        self.lookups += 4 * rows.size
 
-        return elevation_value
+        top = (
+            self.elevation_data[rows, cols] * (1 - col_weights) +
+            self.elevation_data[rows, cols + 1] * col_weights
+        )
+        bottom = (
+            self.elevation_data[rows + 1, cols] * (1 - col_weights) +
+            self.elevation_data[rows + 1, cols + 1] * col_weights
+        )
+
+        return top * (1 - row_weights) + bottom * row_weights
 
     def detection_angles(self, target_location, image_size, fov_horizontal, fov_vertical):
         x, y = target_location
@@ -72,14 +228,14 @@ class GEOSpatial:
         theta_x, theta_y = detection_offset
 
         final_roll = view_roll
-        final_pitch = view_pitch + theta_y
-        final_yaw = view_yaw + theta_x
+        final_pitch = view_pitch + numpy.asarray(theta_y)
+        final_yaw = view_yaw + numpy.asarray(theta_x)
 
-        direction_vector = numpy.array([
-            math.cos(final_pitch) * math.sin(final_yaw),
-            math.cos(final_pitch) * math.cos(final_yaw),
-            math.sin(final_pitch)
-        ])
+        direction_vector = numpy.stack([
+            numpy.cos(final_pitch) * numpy.sin(final_yaw),
+            numpy.cos(final_pitch) * numpy.cos(final_yaw),
+            numpy.sin(final_pitch)
+        ], axis=-1)
 
         cos_roll = math.cos(final_roll)
         sin_roll = math.sin(final_roll)
@@ -88,32 +244,143 @@ class GEOSpatial:
             [0, cos_roll, -sin_roll],
             [0, sin_roll, cos_roll]
         ])
-        direction_vector = numpy.dot(rotation_matrix, direction_vector)
+        direction_vector = numpy.dot(direction_vector, rotation_matrix.T)
 
         return direction_vector
 
-    def find_target_location(self, drone_position, direction_vector):
-        step_size = 0.1
-        max_distance = 1000
+    def ray_points(self, drone_position, direction_vector, distances):
+        lat_step = 1 / 111320
+        lon_step = 1 / (111320 * math.cos(math.radians(drone_position.latitude)))
+
+        latitudes = drone_position.latitude + direction_vector[..., 1] * lat_step * distances
+        longitudes = drone_position.longitude + direction_vector[..., 0] * lon_step * distances
+        altitudes = drone_position.altitude + direction_vector[..., 2] * distances
+
+        return latitudes, longitudes, altitudes
+
+    def _ray_grid(self, drone_position, direction_vectors):
+        latitudes, longitudes, _ = self.ray_points(
+            drone_position, direction_vectors, numpy.array([[0.0], [self.max_distance]])
+        )
+        rows, cols = self.pixel_coordinates(latitudes, longitudes)
+
+        row_start, col_start = rows[0] - 0.5, cols[0] - 0.5
+        row_step = (rows[1] - rows[0]) / self.max_distance
+        col_step = (cols[1] - cols[0]) / self.max_distance
+
+        return row_start, col_start, row_step, col_step
+
+    def _cell_exits(self, distances, grid_rows, grid_cols, row_steps, col_steps):
+        sizes = numpy.array(self.pyramid_sizes, dtype=float)
+        exit_distances = numpy.full((len(distances), len(sizes)), float(self.max_distance))
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            for positions, steps in ((grid_rows, row_steps), (grid_cols, col_steps)):
+                cells = numpy.floor(positions[:, None] / sizes)
+                boundaries = numpy.where(steps[:, None] > 0, cells + 1, cells) * sizes
+                crossings = distances[:, None] + (boundaries - positions[:, None]) / steps[:, None]
+                exit_distances = numpy.where(steps[:, None] != 0, numpy.minimum(exit_distances, crossings), exit_distances)
+
+        return exit_distances
+
+    def _cell_maxima(self, grid_rows, grid_cols):
+        sizes = numpy.array(self.pyramid_sizes, dtype=float)
 
-        lat_step = step_size / 111320
-        lon_step = step_size / (111320 * math.cos(math.radians(drone_position.latitude)))
+        cell_rows = numpy.floor(grid_rows[:, None] / sizes).astype(int)
+        cell_cols = numpy.floor(grid_cols[:, None] / sizes).astype(int)
 
-        for i in range(1, int(max_distance / step_size)):
-            d_lat = direction_vector[1] * lat_step * i
-            d_lon = direction_vector[0] * lon_step * i
-            d_alt = direction_vector[2] * step_size * i
+        return self.pyramid_cells[self.pyramid_offsets + cell_rows * self.pyramid_widths + cell_cols]
 
-            new_lat = drone_position.latitude + d_lat
-            new_lon = drone_position.longitude + d_lon
-            new_alt = drone_position.altitude + d_alt
+    def _refine_hits(self, drone_position, direction_vectors, ray_grid, lower, upper):
+        row_start, col_start, row_step, col_step = (values[:, None] for values in ray_grid)
+        vertical = direction_vectors[:, 2, None]
 
-            terrain_height = self.find_elevation(new_lat, new_lon)
+        target_locations = [None] * len(direction_vectors)
 
-            if new_alt <= terrain_height:
-                return new_lat, new_lon, terrain_height
+        rays = numpy.arange(len(direction_vectors))
+        for step in (self.coarse_step, self.tolerance):
+            if not rays.size:
+                return target_locations
 
-        return None
+            samples = max(int(math.ceil(numpy.max(upper - lower) / step)), 1)
+            distances = lower[:, None] + (upper - lower)[:, None] * numpy.linspace(0, 1, samples + 1)
+
+            altitudes = drone_position.altitude + vertical[rays] * distances
+            terrain_heights = self.interpolate_elevation(
+                row_start[rays] + row_step[rays] * distances,
+                col_start[rays] + col_step[rays] * distances
+            )
+
+            below = altitudes <= terrain_heights
+            hits = below.any(axis=1)
+            indices = numpy.argmax(below, axis=1)[hits]
+
+            rays = rays[hits]
+            distances = distances[hits]
+            terrain_heights = terrain_heights[hits]
+
+            lower = distances[numpy.arange(len(rays)), numpy.maximum(indices - 1, 0)]
+            upper = distances[numpy.arange(len(rays)), indices]
+
+        latitudes, longitudes, _ = self.ray_points(drone_position, direction_vectors[rays], upper)
+        heights = terrain_heights[numpy.arange(len(rays)), indices]
+
+        for ray, latitude, longitude, height in zip(rays, latitudes, longitudes, heights):
+            target_locations[ray] = (float(latitude), float(longitude), float(height))
+
+        return target_locations
+
+    def find_target_locations(self, drone_position, direction_vectors):
+        direction_vectors = numpy.atleast_2d(numpy.asarray(direction_vectors, dtype=float))
+        row_start, col_start, row_step, col_step = self._ray_grid(drone_position, direction_vectors)
+        vertical = direction_vectors[:, 2]
+
+        target_locations = [None] * len(direction_vectors)
+        distances = numpy.zeros(len(direction_vectors))
+        active = numpy.arange(len(direction_vectors))
+
+        while active.size:
+            grid_rows = row_start[active] + row_step[active] * distances[active]
+            grid_cols = col_start[active] + col_step[active] * distances[active]
+
+            inside = (
+                (distances[active] < self.max_distance) &
+                (grid_rows >= 0) & (grid_rows < self.src.height - 1) &
+                (grid_cols >= 0) & (grid_cols < self.src.width - 1)
+            )
+            active, grid_rows, grid_cols = active[inside], grid_rows[inside], grid_cols[inside]
+            if not active.size:
+                break
+
+            exit_distances = self._cell_exits(distances[active], grid_rows, grid_cols, row_step[active], col_step[active])
+            lowest_altitudes = drone_position.altitude + vertical[active, None] * numpy.where(
+                vertical[active, None] > 0, distances[active, None], exit_distances
+            )
+            safe_levels = numpy.sum(lowest_altitudes > self._cell_maxima(grid_rows, grid_cols), axis=1)
+
+            refine = safe_levels == 0
+            if refine.any():
+                refined = active[refine]
+                hits = self._refine_hits(
+                    drone_position,
+                    direction_vectors[refined],
+                    (row_start[refined], col_start[refined], row_step[refined], col_step[refined]),
+                    distances[refined],
+                    exit_distances[refine, 0]
+                )
+                for ray, target_location in zip(refined, hits):
+                    target_locations[ray] = target_location
+
+            skip_levels = numpy.maximum(safe_levels - 1, 0)
+            distances[active] = exit_distances[numpy.arange(len(active)), skip_levels] + 1e-6
+
+            finished = numpy.array([target_locations[ray] is not None for ray in active], dtype=bool)
+            active = active[~finished]
+
+        return target_locations
+
+    def find_target_location(self, drone_position, direction_vector):
+        return self.find_target_locations(drone_position, [direction_vector])[0]
 
     def distance_between_locations(self, lat1, lon1, alt1, lat2, lon2, alt2):
         phi1, phi2 = math.radians(lat1), math.radians(lat2)
@@ -0,0 +1,237 @@
+import ast
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+import numpy
+from ultralytics import YOLO
+
+
+def letterbox(frame, size, pad_value=114):
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+
+    resized_width = int(round(width * scale))
+    resized_height = int(round(height * scale))
+    pad_x = (size - resized_width) // 2
+    pad_y = (size - resized_height) // 2
+
+    image = numpy.full((size, size, 3), pad_value, dtype=numpy.uint8)
+    image[pad_y:pad_y + resized_height, pad_x:pad_x + resized_width] = cv2.resize(
+        frame, (resized_width, resized_height), interpolation=cv2.INTER_LINEAR
+    )
+
+    return image, scale, (pad_x, pad_y)
+
+
+def filter_detections(detections, classes=None, conf=0.25):
+    keep = detections[:, 4] >= conf
+    if classes is not None:
+        keep &= numpy.isin(detections[:, 5], classes)
+
+    return detections[keep]
+
+
+def decode_predictions(output, scale, pad, frame_shape, classes=None, conf=0.25, iou=0.5, max_det=10):
+    predictions = output[0].T
+    scores = predictions[:, 4:]
+
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[numpy.arange(len(scores)), class_ids]
+
+    keep = confidences >= conf
+    if classes is not None:
+        keep &= numpy.isin(class_ids, classes)
+
+    boxes = predictions[keep, :4]
+    confidences = confidences[keep]
+    class_ids = class_ids[keep]
+
+    if not len(boxes):
+        return numpy.empty((0, 6), dtype=numpy.float32)
+
+    # cx, cy, w, h in letterboxed pixels to x1, y1, x2, y2 in frame pixels
+    corners = numpy.empty_like(boxes)
+    corners[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+    corners[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+    corners -= numpy.array([pad[0], pad[1], pad[0], pad[1]])
+    corners /= scale
+
+    height, width = frame_shape[:2]
+    corners[:, [0, 2]] = corners[:, [0, 2]].clip(0, width)
+    corners[:, [1, 3]] = corners[:, [1, 3]].clip(0, height)
+
+    indices = cv2.dnn.NMSBoxes(
+        numpy.column_stack((corners[:, :2], corners[:, 2:] - corners[:, :2])).tolist(),
+        confidences.tolist(),
+        conf,
+        iou
+    )
+
+    indices = numpy.array(indices, dtype=int).reshape(-1)[:max_det]
+
+    return numpy.column_stack((corners[indices], confidences[indices], class_ids[indices])).astype(numpy.float32)
+
+
+class UltralyticsBackend:
+    def __init__(self, model_path, input_size=640, threads=None):
+        self.input_size = input_size
+
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def predict(self, frame, classes=None, conf=0.25, iou=0.5, max_det=10):
+        return self.predict_batch([frame], classes, conf, iou, max_det)[0]
+
+    def predict_batch(self, frames, classes=None, conf=0.25, iou=0.5, max_det=10):
+        results = self.model.predict(
+            source=list(frames),
+            imgsz=self.input_size,
+            classes=classes,
+            conf=conf,
+            iou=iou,
+            max_det=max_det,
+            augment=False,
+            agnostic_nms=True,
+            device="cpu",
+            half=False,
+            verbose=False
+        )
+
+        return [
+            filter_detections(result.boxes.data.cpu().numpy().reshape(-1, 6), classes, conf)
+            for result in results
+        ]
+
+
+class OnnxBackend:
+    def __init__(self, model_path, input_size=640, threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+
+        self.session = onnxruntime.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_size = input_size
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+
+    def preprocess(self, frame):
+        image, scale, pad = letterbox(frame, self.input_size)
+
+        blob = cv2.dnn.blobFromImage(image, scalefactor=1 / 255, swapRB=True)
+
+        return blob, scale, pad
+
+    def predict(self, frame, classes=None, conf=0.25, iou=0.5, max_det=10):
+        blob, scale, pad = self.preprocess(frame)
+        output = self.session.run(None, {self.input_name: blob})[0]
+
+        return decode_predictions(output, scale, pad, frame.shape, classes, conf, iou, max_det)
+
+    def predict_batch(self, frames, classes=None, conf=0.25, iou=0.5, max_det=10):
+        if not self.dynamic_batch:
+            return [self.predict(frame, classes, conf, iou, max_det) for frame in frames]
+
+        inputs = [self.preprocess(frame) for frame in frames]
+        output = self.session.run(None, {self.input_name: numpy.concatenate([blob for blob, _, _ in inputs])})[0]
+
+        return [
+            decode_predictions(output[index:index + 1], scale, pad, frame.shape, classes, conf, iou, max_det)
+            for index, (frame, (_, scale, pad)) in enumerate(zip(frames, inputs))
+        ]
+
+
+class SharedDetector:
+    def __init__(self, backend, max_batch_size=8, batch_window=0.005):
+        self.backend = backend
+        self.names = backend.names
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.frames = 0
+
+        self.thread = threading.Thread(target=self.run, name="shared-detector", daemon=True)
+        self.thread.start()
+
+    def predict(self, frame, classes=None, conf=0.25, iou=0.5, max_det=10):
+        future = Future()
+        options = (tuple(classes) if classes is not None else None, conf, iou, max_det)
+        self.requests.put((frame, options, future))
+
+        return future.result()
+
+    def collect(self):
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.batch_window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def run(self):
+        while True:
+            groups = {}
+            for frame, options, future in self.collect():
+                groups.setdefault(options, []).append((frame, future))
+
+            for options, requests in groups.items():
+                classes, conf, iou, max_det = options
+                try:
+                    results = self.backend.predict_batch(
+                        [frame for frame, _ in requests],
+                        list(classes) if classes is not None else None,
+                        conf, iou, max_det
+                    )
+                except Exception as error:
+                    for _, future in requests:
+                        future.set_exception(error)
+                    continue
+
+                self.batches += 1
+                self.frames += len(requests)
+                for (_, future), result in zip(requests, results):
+                    future.set_result(result)
+
+
+BACKENDS = {
+    "ultralytics": UltralyticsBackend,
+    "onnx": OnnxBackend
+}
+
+
+def create_backend(name, model_path, input_size=640, threads=None, warmup=1):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name}")
+
+    backend = BACKENDS[name](model_path, input_size=input_size, threads=threads)
+
+    frame = numpy.zeros((input_size, input_size, 3), dtype=numpy.uint8)
+    for _ in range(warmup):
+        backend.predict(frame)
+
+    return backend
@@ -0,0 +1,106 @@
+import threading
+
+import numpy
+
+
+def box_iou(boxes_a, boxes_b):
+    boxes_a = numpy.asarray(boxes_a, dtype=float).reshape(-1, 4)
+    boxes_b = numpy.asarray(boxes_b, dtype=float).reshape(-1, 4)
+
+    top_left = numpy.maximum(boxes_a[:, numpy.newaxis, :2], boxes_b[numpy.newaxis, :, :2])
+    bottom_right = numpy.minimum(boxes_a[:, numpy.newaxis, 2:], boxes_b[numpy.newaxis, :, 2:])
+    intersection = (bottom_right - top_left).clip(0).prod(axis=2)
+
+    area_a = (boxes_a[:, 2:] - boxes_a[:, :2]).prod(axis=1)
+    area_b = (boxes_b[:, 2:] - boxes_b[:, :2]).prod(axis=1)
+    union = area_a[:, numpy.newaxis] + area_b[numpy.newaxis, :] - intersection
+
+    return numpy.divide(intersection, union, out=numpy.zeros_like(intersection), where=union > 0)
+
+
+class SharedExtractor:
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.extractor, name)
+
+    def __call__(self, crops):
+        with self.lock:
+            return self.extractor(crops)
+
+
+class BatchedExtractor:
+    def __init__(self, extractor, max_batch_size=32, reuse_iou=None, match_iou=0.5):
+        self.extractor = extractor
+        self.max_batch_size = max_batch_size
+        self.reuse_iou = reuse_iou
+        self.match_iou = match_iou
+
+        self.boxes = None
+        self.reused = None
+        self.features = None
+        self.track_features = {}
+
+        self.extracted = 0
+        self.skipped = 0
+
+    def __getattr__(self, name):
+        return getattr(self.extractor, name)
+
+    def prime(self, detections):
+        self.boxes = numpy.asarray(detections, dtype=float).reshape(-1, 6)[:, :4]
+        self.reused = None
+
+        if self.reuse_iou is None or not self.track_features or not len(self.boxes):
+            return
+
+        cached_boxes = numpy.array([box for box, _ in self.track_features.values()])
+        cached_features = [feature for _, feature in self.track_features.values()]
+
+        overlaps = box_iou(self.boxes, cached_boxes)
+        best = overlaps.argmax(axis=1)
+        matched = overlaps[numpy.arange(len(best)), best] >= self.reuse_iou
+
+        self.reused = [cached_features[index] if match else None for index, match in zip(best, matched)]
+
+    def __call__(self, crops):
+        if not len(crops):
+            return self.extractor(crops)
+
+        reused = self.reused if self.reused is not None and len(self.reused) == len(crops) else [None] * len(crops)
+        missing = [index for index, feature in enumerate(reused) if feature is None]
+
+        extracted = []
+        for start in range(0, len(missing), self.max_batch_size):
+            batch = [crops[index] for index in missing[start:start + self.max_batch_size]]
+            extracted.extend(numpy.asarray(self.extractor(batch)))
+
+        features = list(reused)
+        for index, feature in zip(missing, extracted):
+            features[index] = feature
+
+        self.extracted += len(missing)
+        self.skipped += len(crops) - len(missing)
+        self.features = numpy.stack(features)
+
+        return self.features
+
+    def remember(self, tracks):
+        features, boxes = self.features, self.boxes
+        self.features = None
+        self.track_features = {}
+
+        if self.reuse_iou is None or features is None or boxes is None or len(features) != len(boxes):
+            return
+
+        updated = [track for track in tracks if track.is_confirmed() and track.time_since_update == 0]
+        if not updated:
+            return
+
+        overlaps = box_iou([track.to_tlbr() for track in updated], boxes)
+        for track, row in zip(updated, overlaps):
+            index = row.argmax()
+            if row[index] >= self.match_iou:
+                self.track_features[track.track_id] = (boxes[index], features[index])
@@ -1,11 +1,11 @@
 from .mavlink.mavlink import MAVLinkController, DataAcquisitionThread
 from .mavlink.mavlink.processor import GimbalProcessor, GlobalPositionProcessor, AttitudeProcessor
 from .data_stream import StreamReceiver
-from .drone_data import DroneData
+from .drone_data import DroneData, SENSORS
 
 
 class DroneDataService:
-    def __init__(self, mavlink_connection_str, host, port):
+    def __init__(self, mavlink_connection_str, host, port, wire_format="json", sensors=SENSORS, stream_mode="request"):
         self.mavlink_connection = MAVLinkController(mavlink_connection_str)
 
         self.attitude_processor = AttitudeProcessor()
@@ -22,7 +22,9 @@ class DroneDataService:
         )
         self.acquisition_thread.start()
 
-        self.stream_receiver = StreamReceiver(host, port)
+        self.wire_format = wire_format
+        self.sensors = sensors
+        self.stream_receiver = StreamReceiver(host, port, wire_format, sensors, mode=stream_mode)
 
     def get_mavlink_data(self):
         attitude_data = self.attitude_processor.get_data()
@@ -37,7 +39,13 @@ class DroneDataService:
 
     def get_drone_data(self):
         data = self.stream_receiver.get_data()
-        drone_data = DroneData.from_json(data)
+        if data is None:
+            return None
+
+        if self.wire_format == "multipart":
+            drone_data = DroneData.from_multipart(data, self.sensors)
+        else:
+            drone_data = DroneData.from_json(data, self.sensors)
 
         return drone_data
 
@@ -1,42 +1,180 @@
+import threading
+import time
+
 import zmq
 
 
 class StreamReceiver:
-    def __init__(self, host, port):
+    def __init__(self, host, port, wire_format="json", sensors=None, mode="request", conflate=True, high_water_mark=1,
+                 receive_timeout=1000, reconnect_interval=0.1, max_reconnect_interval=5.0):
         self.host = host
         self.port = port
+        self.wire_format = wire_format
+        self.sensors = sensors
+
+        self.mode = mode
+        self.conflate = conflate
+        self.high_water_mark = high_water_mark
+
+        self.receive_timeout = receive_timeout
+        self.reconnect_interval = reconnect_interval
+        self.max_reconnect_interval = max_reconnect_interval
+        self.reconnect_delay = reconnect_interval
+
+        self.received = 0
+        self.dropped = 0
+        self.late = 0
+        self.timeouts = 0
+        self.reconnects = 0
 
         self.context = zmq.Context()
         self.socket = None
 
+        self.latest = None
+        self.latest_time = None
+        self.sequence = 0
+        self.delivered = 0
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.receive_thread = None
+
         self.connect()
 
+        if self.mode != "request":
+            self.receive_thread = threading.Thread(target=self.run_receiver, daemon=True)
+            self.receive_thread.start()
+
     def connect(self):
         try:
-            self.socket = self.context.socket(zmq.REQ)
+            if self.mode == "subscribe":
+                self.socket = self.context.socket(zmq.SUB)
+                self.socket.setsockopt(zmq.SUBSCRIBE, b"")
+            elif self.mode == "pull":
+                self.socket = self.context.socket(zmq.PULL)
+            else:
+                self.socket = self.context.socket(zmq.REQ)
+
+            if self.mode != "request":
+                if self.conflate and self.wire_format != "multipart":
+                    self.socket.setsockopt(zmq.CONFLATE, 1)
+                else:
+                    self.socket.setsockopt(zmq.RCVHWM, self.high_water_mark)
+
             self.socket.connect(f"tcp://{self.host}:{self.port}")
         except Exception as error:
             print(f"Failed to connect to the server: {error}")
+            if self.socket:
+                self.socket.close(linger=0)
+                self.socket = None
+
+    def reconnect(self):
+        self.reconnects += 1
+        print(f"Reconnecting to tcp://{self.host}:{self.port} in {self.reconnect_delay:.1f} s")
+
+        if self.socket:
+            self.socket.close(linger=0)
+            self.socket = None
+
+        self.stop_event.wait(self.reconnect_delay)
+        self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_interval)
+
+        self.connect()
 
     def request_data(self):
         try:
-            self.socket.send_string("get_data")
+            if self.wire_format == "multipart" and self.sensors:
+                self.socket.send_string(f"get_frames {','.join(self.sensors)}")
+            elif self.wire_format == "multipart":
+                self.socket.send_string("get_frames")
+            else:
+                self.socket.send_string("get_data")
         except Exception as error:
             print(f"Failed to send data request: {error}")
 
     def receive_data(self):
         try:
+            if self.wire_format == "multipart":
+                return self.socket.recv_multipart(copy=False)
+
             data = self.socket.recv_json()
             return data
         except Exception as error:
             print(f"Failed to receive data: {error}")
 
+    def run_receiver(self):
+        while not self.stop_event.is_set():
+            if self.socket is None:
+                self.reconnect()
+                continue
+
+            if not self.socket.poll(self.receive_timeout):
+                self.timeouts += 1
+                self.reconnect()
+                continue
+
+            data = self.receive_data()
+            if data is None:
+                continue
+
+            self.received += 1
+            self.reconnect_delay = self.reconnect_interval
+
+            with self.condition:
+                if self.sequence > self.delivered:
+                    self.dropped += 1
+
+                self.latest = data
+                self.latest_time = time.monotonic()
+                self.sequence += 1
+                self.condition.notify_all()
+
+    def get_latest(self, timeout=1.0):
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.sequence > self.delivered, timeout):
+                return None
+
+            if (time.monotonic() - self.latest_time) * 1000 > self.receive_timeout:
+                self.late += 1
+
+            self.delivered = self.sequence
+
+            return self.latest
+
     def get_data(self):
+        if self.mode != "request":
+            return self.get_latest(self.receive_timeout / 1000)
+
+        if self.socket is None:
+            self.reconnect()
+            return None
+
         self.request_data()
 
-        return self.receive_data()
+        if not self.socket.poll(self.receive_timeout):
+            self.timeouts += 1
+            self.reconnect()
+            return None
+
+        data = self.receive_data()
+        if data is not None:
+            self.received += 1
+            self.reconnect_delay = self.reconnect_interval
+
+        return data
+
+    def stream_info(self):
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "late": self.late,
+            "timeouts": self.timeouts,
+            "reconnects": self.reconnects
+        }
 
     def close(self):
+        self.stop_event.set()
+        if self.receive_thread:
+            self.receive_thread.join()
         if self.socket:
             self.socket.close()
             print("Socket closed")
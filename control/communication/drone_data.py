@@ -1,12 +1,20 @@
 import base64
 import json
-from dataclasses import dataclass, asdict, field
+from functools import partial
+from dataclasses import dataclass, asdict, field, fields
 from typing import List
 
 import numpy
 import cv2
 
 
+def frame_header(sensor, encoding):
+    header = {data_field.name: getattr(sensor, data_field.name) for data_field in fields(sensor) if data_field.name != "frame"}
+    header["encoding"] = encoding
+
+    return header
+
+
 @dataclass
 class RangefinderData:
     timestamp: int
@@ -40,6 +48,23 @@ class RangefinderData:
 
         return decoded_frame
 
+    def encode_buffer(self, encoding="png"):
+        if encoding == "raw":
+            return numpy.ascontiguousarray(self.frame)
+
+        _, buffer = cv2.imencode(".png", self.frame, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+
+        return buffer
+
+    def decode_buffer(self, buffer, encoding):
+        if encoding == "raw":
+            return numpy.frombuffer(buffer, dtype=numpy.dtype(self.data_type)).reshape(self.height, self.width)
+
+        frame_array = numpy.frombuffer(buffer, dtype=numpy.uint8)
+        decoded_frame = cv2.imdecode(frame_array, cv2.IMREAD_UNCHANGED)
+
+        return decoded_frame
+
     def to_json(self):
         data = asdict(self)
         data.pop("frame")
@@ -56,6 +81,15 @@ class RangefinderData:
 
         return instance
 
+    @classmethod
+    def from_buffer(cls, header, buffer):
+        header = dict(header)
+        encoding = header.pop("encoding")
+        instance = cls(frame=numpy.array([]), **header)
+        instance.frame = instance.decode_buffer(buffer, encoding)
+
+        return instance
+
 
 @dataclass
 class CameraData:
@@ -88,6 +122,23 @@ class CameraData:
 
         return decoded_frame
 
+    def encode_buffer(self, encoding="jpg"):
+        if encoding == "raw":
+            return numpy.ascontiguousarray(self.frame)
+
+        _, buffer = cv2.imencode(".jpg", self.frame, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
+
+        return buffer
+
+    def decode_buffer(self, buffer, encoding):
+        if encoding == "raw":
+            return numpy.frombuffer(buffer, dtype=numpy.dtype(self.data_type)).reshape(self.height, self.width, -1)
+
+        frame_array = numpy.frombuffer(buffer, dtype=numpy.uint8)
+        decoded_frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
+
+        return decoded_frame
+
     def to_json(self):
         data = asdict(self)
         data.pop("frame")
@@ -104,6 +155,15 @@ class CameraData:
 
         return instance
 
+    @classmethod
+    def from_buffer(cls, header, buffer):
+        header = dict(header)
+        encoding = header.pop("encoding")
+        instance = cls(frame=numpy.array([]), **header)
+        instance.frame = instance.decode_buffer(buffer, encoding)
+
+        return instance
+
 
 @dataclass
 class FDMData:
@@ -171,32 +231,103 @@ class GimbalData:
         )
 
 
+class LazySensor:
+    def __init__(self, sensor_class):
+        self.sensor_class = sensor_class
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return None
+
+        value = instance.__dict__.get(self.name)
+        if isinstance(value, partial):
+            value = value()
+            instance.__dict__[self.name] = value
+
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+
+SENSORS = ("camera", "depth", "rangefinder")
+
+
 @dataclass
 class DroneData:
     timestamp: float
     fdm: FDMData
     gimbal: GimbalData
-    camera: CameraData
-    depth: RangefinderData
-    rangefinder: RangefinderData
+    camera: CameraData = LazySensor(CameraData)
+    depth: RangefinderData = LazySensor(RangefinderData)
+    rangefinder: RangefinderData = LazySensor(RangefinderData)
+
+    @classmethod
+    def sensor_class(cls, name):
+        return cls.__dict__[name].sensor_class
 
     def to_json(self):
-        return json.dumps({"timestamp": self.timestamp,
-                           "fdm": json.loads(self.fdm.to_json()),
-                           "gimbal": json.loads(self.gimbal.to_json()),
-                           "camera": json.loads(self.camera.to_json()),
-                           "depth": json.loads(self.depth.to_json()),
-                           "rangefinder": json.loads(self.rangefinder.to_json())})
+        data = {"timestamp": self.timestamp,
+                "fdm": json.loads(self.fdm.to_json()),
+                "gimbal": json.loads(self.gimbal.to_json())}
+
+        for name in SENSORS:
+            sensor = getattr(self, name)
+            if sensor is not None:
+                data[name] = json.loads(sensor.to_json())
+
+        return json.dumps(data)
 
     @classmethod
-    def from_json(cls, data):
+    def from_json(cls, data, sensors=SENSORS):
         data = json.loads(data)
 
         return cls(
             timestamp=data["timestamp"],
             fdm=FDMData.from_dict(data["fdm"]),
             gimbal=GimbalData.from_dict(data["gimbal"]),
-            camera=CameraData.from_dict(data["camera"]),
-            depth=RangefinderData.from_dict(data["depth"]),
-            rangefinder=RangefinderData.from_dict(data["rangefinder"])
-        )
\ No newline at end of file
+            **{
+                name: partial(cls.sensor_class(name).from_dict, data[name])
+                for name in sensors if name in data
+            }
+        )
+
+    def to_multipart(self, encodings=None):
+        encodings = {"camera": "jpg", "depth": "png", "rangefinder": "png", **(encodings or {})}
+
+        header = {
+            "timestamp": self.timestamp,
+            "fdm": asdict(self.fdm),
+            "gimbal": asdict(self.gimbal),
+            "frames": []
+        }
+        buffers = []
+
+        for name in SENSORS:
+            sensor = getattr(self, name)
+            if sensor is None:
+                continue
+
+            header[name] = frame_header(sensor, encodings[name])
+            header["frames"].append(name)
+            buffers.append(sensor.encode_buffer(encodings[name]))
+
+        return [json.dumps(header).encode("utf-8")] + buffers
+
+    @classmethod
+    def from_multipart(cls, frames, sensors=SENSORS):
+        header = json.loads(bytes(memoryview(frames[0])))
+        buffers = dict(zip(header["frames"], frames[1:]))
+
+        return cls(
+            timestamp=header["timestamp"],
+            fdm=FDMData.from_dict(header["fdm"]),
+            gimbal=GimbalData.from_dict(header["gimbal"]),
+            **{
+                name: partial(cls.sensor_class(name).from_buffer, header[name], memoryview(buffers[name]))
+                for name in sensors if name in buffers
+            }
+        )
@@ -1,21 +1,40 @@
 import math
+import queue
 import threading
 import random
 import time
+from collections import deque
 
 import cv2
 
 from .communication.communicator import DroneDataService
 from .analysis.analysist import DroneAnalysisService
+from .encoding import DEFAULT_QUALITY, FrameCache
+from .pipeline import Stage, rate
 from datetime import datetime
 
 
 class DroneCoreService:
-    def __init__(self, mavlink_address, stream_host, stream_port, model_path, dem_path):
-        self.data_service = DroneDataService(mavlink_address, stream_host, stream_port)
+    def __init__(self, mavlink_address, stream_host, stream_port, model_path, dem_path, stream_format="json", stream_mode="request", queue_size=1,
+                 inference_backend="ultralytics", inference_size=640, inference_threads=None,
+                 reid_reuse_iou=None, dem_cache_size=64 * 1024 * 1024, dem_tolerance=0.1, model=None,
+                 reid_extractor=None):
+        self.data_service = DroneDataService(
+            mavlink_address, stream_host, stream_port, stream_format,
+            sensors=("camera",),
+            stream_mode=stream_mode
+        )
         self.analysis_service = DroneAnalysisService(
             model_path,
-            dem_path
+            dem_path,
+            backend=inference_backend,
+            input_size=inference_size,
+            threads=inference_threads,
+            reid_reuse_iou=reid_reuse_iou,
+            dem_cache_size=dem_cache_size,
+            dem_tolerance=dem_tolerance,
+            model=model,
+            reid_extractor=reid_extractor
         )
 
         self.colors = [(
@@ -24,18 +43,51 @@ class DroneCoreService:
             random.randint(0, 255)) for j in range(1000)
         ]
 
+        self.detection_interval = 1
+        self.motion_threshold = math.radians(5)
+        self.frames_since_detection = 0
+        self.detection_view = None
+
         self.latest = None
-        self.running = False
+        self.subscribers = []
+        self.frame_cache = FrameCache()
+        self.running_event = threading.Event()
+        self.last_frame_timestamp = None
+
+        self.detect_queue = queue.Queue(maxsize=queue_size)
+        self.track_queue = queue.Queue(maxsize=queue_size)
+        self.render_queue = queue.Queue(maxsize=queue_size)
+
+        self.ingest_stage = Stage(
+            "ingest", self.ingest, output_queue=self.detect_queue, run_event=self.running_event, idle=0.02, max_idle=0.2
+        )
+        self.stages = [
+            Stage("detect", self.detect, self.detect_queue, self.track_queue),
+            Stage("track", self.track, self.track_queue, self.render_queue),
+            Stage("render", self.render, self.render_queue)
+        ]
 
-        self.analysis_thread = threading.Thread(target=self.run_analysis)
-        self.analysis_thread.start()
+        self.result_times = deque(maxlen=30)
+        self.result_latencies = deque(maxlen=30)
+
+        for stage in [self.ingest_stage] + self.stages:
+            stage.start()
         self.start_analysis()
 
+    @property
+    def running(self):
+        return self.running_event.is_set()
+
     def start_analysis(self):
-        self.running = True
+        self.running_event.set()
 
     def stop_analysis(self):
-        self.running = False
+        self.running_event.clear()
+
+    def shutdown(self):
+        for stage in [self.ingest_stage] + self.stages:
+            stage.stop()
+        self.stop_analysis()
 
     def execute_command(self, command_dictionary):
         command = command_dictionary["COMMAND"]
@@ -98,7 +150,8 @@ class DroneCoreService:
         else:
             return "FAILED"
 
-    def update_settings(self, detection_threshold, iou_threshold, max_detections, classes_excluded):
+    def update_settings(self, detection_threshold, iou_threshold, max_detections, classes_excluded, detection_interval=1):
+        self.detection_interval = max(1, detection_interval)
         self.analysis_service.detection_threshold = detection_threshold
         self.analysis_service.iou_threshold = iou_threshold
         self.analysis_service.max_detections = max_detections
@@ -106,6 +159,10 @@ class DroneCoreService:
 
     def get_drone_data(self):
         drone_data = self.data_service.get_drone_data()
+        if drone_data is None or drone_data.timestamp == self.last_frame_timestamp:
+            return None
+
+        self.last_frame_timestamp = drone_data.timestamp
 
         camera_frame = drone_data.camera.frame
         image_width = drone_data.camera.width
@@ -159,8 +216,13 @@ class DroneCoreService:
 
         return image
 
-    def do_analysis(self):
-        camera_frame, image_width, image_height, fov_horizontal, fov_vertical = self.get_drone_data()
+    def ingest(self):
+        drone_data = self.get_drone_data()
+        if drone_data is None:
+            return None
+
+        received = time.monotonic()
+        camera_frame, image_width, image_height, fov_horizontal, fov_vertical = drone_data
         gimbal_data, attitude_data, global_position_data = self.get_mavlink_data()
 
         gimbal_roll, gimbal_pitch, gimbal_yaw = gimbal_data.quaternion.to_euler()
@@ -196,14 +258,61 @@ class DroneCoreService:
             }
         }
 
-        detections = self.analysis_service.predict(camera_frame)
+        return {
+            "result": analysis_result,
+            "received": received,
+            "mavlink": (gimbal_data, attitude_data, global_position_data)
+        }
+
+    def view_angles(self, work):
+        drone = work["result"]["drone"]
+
+        return [
+            drone["gimbal"][axis] + math.radians(drone["attitude"][axis])
+            for axis in ("roll", "pitch", "yaw")
+        ]
 
-        tracks = self.analysis_service.update_tracker(camera_frame, detections)
+    def should_detect(self, work):
+        if self.detection_interval <= 1 or self.detection_view is None:
+            return True
+        if self.frames_since_detection >= self.detection_interval:
+            return True
+        if not self.analysis_service.tracks_stable():
+            return True
+
+        motion = max(
+            abs(math.remainder(current - previous, math.tau))
+            for current, previous in zip(self.view_angles(work), self.detection_view)
+        )
+
+        return motion > self.motion_threshold
+
+    def detect(self, work):
+        camera_frame = work["result"]["drone"]["camera"]["frame"]
+
+        if self.should_detect(work):
+            work["detections"] = self.analysis_service.predict(camera_frame)
+            self.frames_since_detection = 1
+            self.detection_view = self.view_angles(work)
+        else:
+            work["detections"] = None
+            self.frames_since_detection += 1
+
+        return work
+
+    def track(self, work):
+        camera = work["result"]["drone"]["camera"]
+        gimbal_data, attitude_data, global_position_data = work["mavlink"]
+
+        if work["detections"] is None:
+            tracks = self.analysis_service.propagate_tracker()
+        else:
+            tracks = self.analysis_service.update_tracker(camera["frame"], work["detections"])
 
         tracks_locations = self.analysis_service.geospatial_analysis(
             tracks,
-            image_width, image_height,
-            fov_horizontal, fov_vertical,
+            camera["width"], camera["height"],
+            camera["fov_horizontal"], camera["fov_vertical"],
             gimbal_data, attitude_data, global_position_data
         )
 
@@ -212,7 +321,8 @@ class DroneCoreService:
             track_id = track.track_id
             class_id = track.class_id
 
-            track_latitude, track_longitude, track_altitude = tracks_locations[track_id]
+            # rays above the horizon or off the DEM have no ground hit
+            track_latitude, track_longitude, track_altitude = tracks_locations.get(track_id) or (None, None, None)
 
             track_results = {
                 "track_id": track_id,
@@ -230,27 +340,48 @@ class DroneCoreService:
                 }
             }
 
-            analysis_result["analysis"]["tracks"].append(track_results)
+            work["result"]["analysis"]["tracks"].append(track_results)
 
-            self.paint_info(camera_frame, [x1, y1, x2, y2], track_id)
+        return work
+
+    def render(self, work):
+        analysis_result = work["result"]
+        camera_frame = analysis_result["drone"]["camera"]["frame"]
+
+        for track in analysis_result["analysis"]["tracks"]:
+            frame = track["frame"]
+            self.paint_info(camera_frame, [frame["x1"], frame["y1"], frame["x2"], frame["y2"]], track["track_id"])
 
         analysis_result["analysis"]["frame"] = camera_frame
+        analysis_result["fps"] = rate(self.result_times)
 
         self.latest = analysis_result
+        for subscriber in self.subscribers:
+            subscriber(analysis_result)
 
-    def run_analysis(self):
-        while True:
-            if self.running:
-                try:
-                    self.do_analysis()
-                except Exception:
-                    self.restart_analysis()
-            else:
-                time.sleep(0.1)
+        finished = time.monotonic()
+        self.result_times.append(finished)
+        self.result_latencies.append(finished - work["received"])
 
-    def restart_analysis(self):
-        self.analysis_thread = threading.Thread(target=self.run_analysis)
-        self.analysis_thread.start()
+        return work
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
 
     def get_analysis(self):
         return self.latest
+
+    def encode_frame(self, analysis, format="jpg", quality=DEFAULT_QUALITY, rendition="full", track_id=None):
+        return self.frame_cache.encode(analysis, format, quality, rendition, track_id)
+
+    def class_name(self, class_id):
+        return self.analysis_service.model.names[class_id]
+
+    def pipeline_info(self):
+        return {
+            "fps": rate(self.result_times),
+            "latency": sum(self.result_latencies) / len(self.result_latencies) if self.result_latencies else 0.0,
+            "stages": {stage.name: stage.info() for stage in [self.ingest_stage] + self.stages},
+            "stream": self.data_service.stream_receiver.stream_info(),
+            "elevation_cache": self.analysis_service.geospatial.cache_info()
+        }
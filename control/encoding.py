@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+
+import cv2
+
+DEFAULT_QUALITY = 80
+RENDITIONS = ("full", "half", "thumb")
+THUMB_WIDTH = 160
+
+QUALITY_FLAGS = {
+    "jpg": cv2.IMWRITE_JPEG_QUALITY,
+    "webp": cv2.IMWRITE_WEBP_QUALITY
+}
+
+
+def encode_image(frame, format="jpg", quality=DEFAULT_QUALITY):
+    success, encoded = cv2.imencode(f".{format}", frame, [QUALITY_FLAGS[format], quality])
+    if not success:
+        raise ValueError(f"Failed to encode frame as {format}")
+
+    return encoded.tobytes()
+
+
+def crop_track(frame, tracks, track_id, margin=0.5, min_size=64):
+    for track in tracks:
+        if track["track_id"] == track_id:
+            box = track["frame"]
+            break
+    else:
+        raise KeyError(f"Unknown track: {track_id}")
+
+    height, width = frame.shape[:2]
+    center_x = (box["x1"] + box["x2"]) / 2
+    center_y = (box["y1"] + box["y2"]) / 2
+    half_width = max((box["x2"] - box["x1"]) * (1 + margin), min_size) / 2
+    half_height = max((box["y2"] - box["y1"]) * (1 + margin), min_size) / 2
+
+    x1, x2 = int(max(center_x - half_width, 0)), int(min(center_x + half_width, width))
+    y1, y2 = int(max(center_y - half_height, 0)), int(min(center_y + half_height, height))
+
+    return frame[y1:y2, x1:x2]
+
+
+def render_frame(analysis, rendition="full", track_id=None):
+    frame = analysis["analysis"]["frame"]
+
+    if track_id is not None:
+        frame = crop_track(frame, analysis["analysis"]["tracks"], track_id)
+
+    if rendition == "full":
+        return frame
+    if rendition == "half":
+        return cv2.resize(frame, (frame.shape[1] // 2, frame.shape[0] // 2), interpolation=cv2.INTER_AREA)
+    if rendition == "thumb":
+        scale = min(THUMB_WIDTH / frame.shape[1], 1.0)
+        return cv2.resize(frame, (int(frame.shape[1] * scale), int(frame.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+
+    raise ValueError(f"Unknown rendition: {rendition}")
+
+
+class AdaptiveQuality:
+    def __init__(self, target_bitrate, quality=DEFAULT_QUALITY, min_quality=30, max_quality=90, step=10, smoothing=0.3):
+        self.target_bitrate = target_bitrate
+        self.quality = quality
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.step = step
+        self.smoothing = smoothing
+
+        self.bitrate = None
+        self.last_timestamp = None
+
+    def update(self, timestamp, size):
+        last_timestamp, self.last_timestamp = self.last_timestamp, timestamp
+        if last_timestamp is None or timestamp <= last_timestamp:
+            return self.quality
+
+        bitrate = size * 8 / (timestamp - last_timestamp).total_seconds()
+        if self.bitrate is None:
+            self.bitrate = bitrate
+        else:
+            self.bitrate += self.smoothing * (bitrate - self.bitrate)
+
+        # quantized steps keep clients with the same target on shared cache entries
+        if self.bitrate > self.target_bitrate:
+            self.quality = max(self.quality - self.step, self.min_quality)
+        elif self.bitrate < self.target_bitrate * 0.7:
+            self.quality = min(self.quality + self.step, self.max_quality)
+
+        return self.quality
+
+
+class FrameCache:
+    def __init__(self, size=4):
+        self.size = size
+        self.lock = threading.Lock()
+        self.results = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, timestamp, key):
+        with self.lock:
+            encodings = self.results.get(timestamp)
+            if encodings is None:
+                # late requests for older results must not evict the live ones
+                if self.results and timestamp < next(reversed(self.results)):
+                    return [threading.Lock(), None]
+
+                encodings = self.results[timestamp] = {}
+                while len(self.results) > self.size:
+                    self.results.popitem(last=False)
+
+            if key not in encodings:
+                encodings[key] = [threading.Lock(), None]
+
+            return encodings[key]
+
+    def encode(self, analysis, format="jpg", quality=DEFAULT_QUALITY, rendition="full", track_id=None):
+        entry = self.entry(analysis["timestamp"], (format, quality, rendition, track_id))
+
+        with entry[0]:
+            if entry[1] is None:
+                self.misses += 1
+                entry[1] = encode_image(render_frame(analysis, rendition, track_id), format, quality)
+            else:
+                self.hits += 1
+
+            return entry[1]
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "results": len(self.results)
+        }
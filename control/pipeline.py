@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from collections import deque
+
+
+def put_latest(target, item):
+    dropped = 0
+
+    while True:
+        try:
+            target.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                target.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+
+def rate(times):
+    if len(times) < 2 or times[-1] == times[0]:
+        return 0.0
+
+    return (len(times) - 1) / (times[-1] - times[0])
+
+
+class Stage:
+    def __init__(self, name, function, input_queue=None, output_queue=None, run_event=None,
+                 window=30, backoff=0.1, max_backoff=5.0, idle=0.0, max_idle=0.0):
+        self.name = name
+        self.function = function
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+
+        self.run_event = run_event
+        self.stop_event = threading.Event()
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idle = idle
+        self.max_idle = max_idle
+
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.dropped = 0
+
+        self.finish_times = deque(maxlen=window)
+        self.busy_times = deque(maxlen=window)
+
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name=f"{self.name}-stage", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+        if self.run_event is not None:
+            self.run_event.set()
+        if self.input_queue is not None:
+            put_latest(self.input_queue, None)
+        if self.thread is not None:
+            self.thread.join()
+
+    def process(self, *args):
+        start = time.monotonic()
+        result = self.function(*args)
+        finish = time.monotonic()
+
+        if result is None:
+            self.skipped += 1
+            return None
+
+        self.processed += 1
+        self.finish_times.append(finish)
+        self.busy_times.append(finish - start)
+
+        if self.output_queue is not None:
+            self.dropped += put_latest(self.output_queue, result)
+
+        return result
+
+    def next_arguments(self):
+        if self.input_queue is None:
+            if self.run_event is not None:
+                self.run_event.wait()
+            return ()
+
+        item = self.input_queue.get()
+        if item is None:
+            return None
+
+        return (item,)
+
+    def run(self):
+        delay = self.backoff
+        idle = self.idle
+
+        while not self.stop_event.is_set():
+            arguments = self.next_arguments()
+            if arguments is None or self.stop_event.is_set():
+                continue
+
+            try:
+                result = self.process(*arguments)
+                delay = self.backoff
+                # sources that produced nothing wait before polling again instead of spinning
+                if result is None and idle:
+                    self.stop_event.wait(idle)
+                    idle = min(idle * 2, self.max_idle)
+                else:
+                    idle = self.idle
+            except Exception as error:
+                self.failed += 1
+                print(f"Stage {self.name} failed, retrying in {delay:.1f} s: {error}")
+                self.stop_event.wait(delay)
+                delay = min(delay * 2, self.max_backoff)
+
+    def info(self):
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "fps": rate(self.finish_times),
+            "latency": sum(self.busy_times) / len(self.busy_times) if self.busy_times else 0.0
+        }
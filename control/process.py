@@ -0,0 +1,260 @@
+import multiprocessing
+import threading
+import time
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy
+
+from .encoding import DEFAULT_QUALITY, FrameCache
+from .streams import StreamManager
+
+
+class SharedFrames:
+    def __init__(self, slots=3, slot_size=1920 * 1080 * 3, name=None):
+        self.slots = slots
+        self.slot_size = slot_size
+        self.owner = name is None
+
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=slots * (8 + slot_size))
+        self.name = self.memory.name
+
+        self.sequences = numpy.ndarray((slots,), dtype=numpy.int64, buffer=self.memory.buf)
+        self.data = numpy.ndarray((slots, slot_size), dtype=numpy.uint8, buffer=self.memory.buf, offset=slots * 8)
+
+        if self.owner:
+            self.sequences[:] = 0
+        self.written = 0
+
+    def write(self, frame):
+        frame = numpy.ascontiguousarray(frame)
+        if frame.nbytes > self.slot_size:
+            return None
+
+        self.written += 1
+        slot = self.written % self.slots
+
+        # sequence lock: readers discard a slot whose sequence changed while copying
+        self.sequences[slot] = -1
+        self.data[slot, :frame.nbytes] = frame.reshape(-1).view(numpy.uint8)
+        self.sequences[slot] = self.written
+
+        return slot, self.written, frame.shape, frame.dtype.str
+
+    def read(self, slot, sequence, shape, dtype):
+        if self.sequences[slot] != sequence:
+            return None
+
+        nbytes = int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize
+        frame = self.data[slot, :nbytes].copy().view(dtype).reshape(shape)
+
+        if self.sequences[slot] != sequence:
+            return None
+
+        return frame
+
+    def close(self):
+        del self.sequences, self.data
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def encode_result(result, frames):
+    frame = result["analysis"]["frame"]
+    location = frames.write(frame) if frame is not None else None
+
+    drone = {**result["drone"], "camera": {**result["drone"]["camera"], "frame": None}}
+    analysis = {**result["analysis"], "frame": None if location is not None else frame}
+
+    return {**result, "drone": drone, "analysis": analysis}, location
+
+
+def decode_result(message, location, frames):
+    if location is None:
+        return message
+
+    frame = frames.read(*location)
+    if frame is None:
+        return None
+
+    message["drone"]["camera"]["frame"] = frame
+    message["analysis"]["frame"] = frame
+
+    return message
+
+
+def serve_commands(manager, connection):
+    while True:
+        message = connection.recv()
+        if message is None:
+            return
+
+        name, method, args, kwargs = message
+        try:
+            connection.send(("ok", getattr(manager.get(name), method)(*args, **kwargs)))
+        except Exception as error:
+            connection.send(("error", f"{type(error).__name__}: {error}"))
+
+
+def run_worker(streams, options, frame_names, slot_size, result_connection, command_connection):
+    manager = StreamManager(streams, **options)
+    frames = {name: SharedFrames(slot_size=slot_size, name=frame_names[name]) for name in streams}
+    lock = threading.Lock()
+
+    def publish(name, result):
+        message, location = encode_result(result, frames[name])
+        with lock:
+            result_connection.send((name, message, location))
+
+    for name, service in manager.services.items():
+        service.subscribe(partial(publish, name))
+
+    command_connection.send(manager.detector.names)
+    serve_commands(manager, command_connection)
+
+    manager.shutdown()
+
+
+class RemoteCoreService:
+    def __init__(self, manager, name):
+        self.manager = manager
+        self.name = name
+        self.latest = None
+        self.subscribers = []
+        self.frame_cache = FrameCache()
+
+    def call(self, method, *args, **kwargs):
+        return self.manager.call(self.name, method, *args, **kwargs)
+
+    def start_analysis(self):
+        self.call("start_analysis")
+
+    def stop_analysis(self):
+        self.call("stop_analysis")
+
+    def execute_command(self, command_dictionary):
+        return self.call("execute_command", command_dictionary)
+
+    def update_settings(self, *args, **kwargs):
+        self.call("update_settings", *args, **kwargs)
+
+    def pipeline_info(self):
+        return self.call("pipeline_info")
+
+    def class_name(self, class_id):
+        return self.manager.class_names[class_id]
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def update_latest(self, result):
+        self.latest = result
+        for subscriber in self.subscribers:
+            subscriber(result)
+
+    def get_analysis(self):
+        return self.latest
+
+    def encode_frame(self, analysis, format="jpg", quality=DEFAULT_QUALITY, rendition="full", track_id=None):
+        return self.frame_cache.encode(analysis, format, quality, rendition, track_id)
+
+
+class RemoteStreamManager:
+    def __init__(self, streams, slot_size=1920 * 1080 * 3, startup_timeout=120.0, **options):
+        self.default = next(iter(streams))
+        self.services = {name: RemoteCoreService(self, name) for name in streams}
+        self.frames = {name: SharedFrames(slot_size=slot_size) for name in streams}
+
+        context = multiprocessing.get_context("spawn")
+        self.result_connection, result_sender = context.Pipe(duplex=False)
+        self.command_connection, command_worker = context.Pipe()
+        self.command_lock = threading.Lock()
+
+        self.process = context.Process(
+            target=run_worker,
+            args=(
+                streams, options,
+                {name: frames.name for name, frames in self.frames.items()}, slot_size,
+                result_sender, command_worker
+            ),
+            name="analysis-worker",
+            daemon=True
+        )
+        self.process.start()
+
+        # the worker must hold the only write ends, so its exit shows up as EOF here
+        result_sender.close()
+        command_worker.close()
+
+        self.class_names = self.wait_for_worker(startup_timeout)
+
+        self.receive_thread = threading.Thread(target=self.receive_results, name="analysis-results", daemon=True)
+        self.receive_thread.start()
+
+    def wait_for_worker(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.command_connection.poll(0.1):
+                try:
+                    return self.command_connection.recv()
+                except EOFError:
+                    break
+            if not self.process.is_alive():
+                break
+
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        for frames in self.frames.values():
+            frames.close()
+
+        raise RuntimeError(f"Analysis worker failed to start (exit code {self.process.exitcode})")
+
+    def receive_results(self):
+        while True:
+            try:
+                name, message, location = self.result_connection.recv()
+            except (EOFError, OSError):
+                return
+
+            result = decode_result(message, location, self.frames[name])
+            if result is not None:
+                self.services[name].update_latest(result)
+
+    def call(self, name, method, *args, **kwargs):
+        with self.command_lock:
+            try:
+                self.command_connection.send((name, method, args, kwargs))
+                status, value = self.command_connection.recv()
+            except (EOFError, OSError):
+                raise RuntimeError(f"Analysis worker exited (exit code {self.process.exitcode})")
+
+        if status == "error":
+            raise RuntimeError(value)
+
+        return value
+
+    def names(self):
+        return list(self.services)
+
+    def get(self, name=None):
+        if name is None:
+            name = self.default
+
+        if name not in self.services:
+            raise KeyError(f"Unknown stream: {name}")
+
+        return self.services[name]
+
+    def shutdown(self):
+        with self.command_lock:
+            try:
+                self.command_connection.send(None)
+            except OSError:
+                pass
+        self.process.join()
+
+        for frames in self.frames.values():
+            frames.close()
@@ -0,0 +1,62 @@
+import json
+
+from .analysis.analysist import create_extractor
+from .analysis.inference import SharedDetector, create_backend
+from .analysis.reid import SharedExtractor
+from .core import DroneCoreService
+
+
+def parse_streams(value, default):
+    if not value:
+        return {"default": default}
+
+    streams = json.loads(value)
+
+    return {name: {**default, **config} for name, config in streams.items()}
+
+
+class StreamManager:
+    def __init__(self, streams, model_path, inference_backend="ultralytics", inference_size=640, inference_threads=None,
+                 max_batch_size=None, batch_window=0.005, reid_batch_size=32, **service_options):
+        backend = create_backend(inference_backend, model_path, input_size=inference_size, threads=inference_threads)
+        self.detector = SharedDetector(
+            backend,
+            max_batch_size=max_batch_size or len(streams),
+            batch_window=batch_window
+        )
+
+        self.extractor = SharedExtractor(create_extractor(reid_batch_size))
+
+        self.default = next(iter(streams))
+        self.services = {
+            name: DroneCoreService(
+                model_path=model_path,
+                model=self.detector,
+                reid_extractor=self.extractor,
+                **{**service_options, **config}
+            )
+            for name, config in streams.items()
+        }
+
+    def names(self):
+        return list(self.services)
+
+    def get(self, name=None):
+        if name is None:
+            name = self.default
+
+        if name not in self.services:
+            raise KeyError(f"Unknown stream: {name}")
+
+        return self.services[name]
+
+    def stream_info(self):
+        return {
+            "batches": self.detector.batches,
+            "frames": self.detector.frames,
+            "streams": {name: service.pipeline_info() for name, service in self.services.items()}
+        }
+
+    def shutdown(self):
+        for service in self.services.values():
+            service.shutdown()
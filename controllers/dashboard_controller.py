@@ -1,13 +1,14 @@
 import base64
-from datetime import datetime, timedelta
+from datetime import datetime
 
-import cv2
-from flask import Blueprint, render_template, jsonify, session
-from app import core_service
+from flask import Blueprint, Response, current_app, render_template, jsonify, session, request
+from control.encoding import RENDITIONS
 from db import db
-from models import Flight, Image, Detection, Point, Setting, FlightSnapshot, Object
+from models import Flight, Setting
+from storage import flight_path
 from utils.jwt import token_required
-from utils.helpers import flight_active_required
+from utils.helpers import flight_active_required, flight_stream
+from utils.live import track_metadata
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -15,7 +16,7 @@ dashboard_bp = Blueprint('dashboard', __name__)
 @dashboard_bp.route('/')
 @token_required
 def dashboard(user_id):
-    return render_template('dashboard.html')
+    return render_template('dashboard.html', streams=current_app.stream_manager.names())
 
 
 @dashboard_bp.route('/start-flight', methods=['POST'])
@@ -24,17 +25,23 @@ def start_flight(user_id):
     if 'flight_id' in session:
         return jsonify({'error': 'End the current flight before starting a new one'}), 400
 
-    new_flight = Flight(user_id=user_id, start_time=datetime.now())
+    stream = (request.get_json(silent=True) or {}).get('stream', current_app.stream_manager.default)
+    if stream not in current_app.stream_manager.services:
+        return jsonify({'error': f'Unknown stream: {stream}'}), 400
+
+    new_flight = Flight(user_id=user_id, start_time=datetime.now(), stream=stream)
     db.session.add(new_flight)
     db.session.commit()
 
     session['flight_id'] = new_flight.id
+    current_app.analysis_writer.refresh()
 
     default_settings = [
         {'parameter': 'confidence', 'value': '0.5'},
         {'parameter': 'jaccard_index', 'value': '0.5'},
         {'parameter': 'detection_limit', 'value': '100'},
-        {'parameter': 'exclude_classes', 'value': '-1'}
+        {'parameter': 'exclude_classes', 'value': '-1'},
+        {'parameter': 'detection_interval', 'value': '1'}
     ]
 
     for setting in default_settings:
@@ -47,7 +54,7 @@ def start_flight(user_id):
 
     db.session.commit()
 
-    return jsonify({'flight_id': new_flight.id})
+    return jsonify({'flight_id': new_flight.id, 'stream': stream})
 
 
 @dashboard_bp.route('/stop-flight', methods=['POST'])
@@ -63,6 +70,8 @@ def stop_flight(user_id):
 
     current_flight.end_time = datetime.now()
     db.session.commit()
+    current_app.analysis_writer.refresh()
+    current_app.segment_store.close_flight(flight_id)
 
     session.pop('flight_id', None)
 
@@ -75,31 +84,28 @@ def stop_flight(user_id):
 def get_flight_info(user_id):
     flight_id = session.get('flight_id')
 
-    all_snapshots = db.session.query(FlightSnapshot).filter_by(flight_id=flight_id).order_by(
-        FlightSnapshot.timestamp.asc()).all()
-    filtered_snapshots = []
-    last_timestamp = None
+    since = request.args.get('since')
+    if since:
+        try:
+            since = datetime.fromisoformat(since)
+        except ValueError:
+            return jsonify({'error': f'Invalid timestamp: {since}'}), 400
+
+    return jsonify({'flight_id': flight_id, 'snapshots': flight_path(flight_id, since or None)})
 
-    for snapshot in all_snapshots:
-        if last_timestamp is None or (snapshot.timestamp - last_timestamp >= timedelta(minutes=1)):
-            filtered_snapshots.append(snapshot)
-            last_timestamp = snapshot.timestamp
 
-    snapshots_data = []
-    for snapshot in filtered_snapshots:
-        point = db.session.query(Point).get(snapshot.point_id)
-        if not point:
-            continue
+def frame_options():
+    rendition = request.args.get('rendition', 'full')
+    if rendition not in RENDITIONS:
+        raise ValueError(f'Unknown rendition: {rendition}')
 
-        snapshots_data.append({
-            'timestamp': snapshot.timestamp.isoformat(),
-            'latitude': point.latitude,
-            'longitude': point.longitude,
-            'altitude': point.altitude,
-            'heading': snapshot.yaw
-        })
+    track_id = request.args.get('track_id', type=int)
+    quality = request.args.get('quality', type=int)
+    if quality is not None:
+        quality = min(max(quality, 1), 100)
+    bitrate = request.args.get('bitrate', type=int)
 
-    return jsonify({'snapshots': snapshots_data})
+    return rendition, track_id, quality, bitrate
 
 
 @dashboard_bp.route('/get-analysis', methods=['GET'])
@@ -108,175 +114,60 @@ def get_flight_info(user_id):
 def get_analysis(user_id):
     flight_id = session.get('flight_id')
 
+    stream = flight_stream(flight_id)
+    core_service = current_app.stream_manager.get(stream)
     analysis = core_service.get_analysis()
 
     if analysis:
-        store_analysis(flight_id, analysis)
-
-        _, compressed_image = cv2.imencode('.jpg', analysis["analysis"]["frame"], [cv2.IMWRITE_JPEG_QUALITY, 70])
-        image = base64.b64encode(compressed_image).decode('utf-8')
-
-        return jsonify({
-            "timestamp": analysis["timestamp"].isoformat(),
-            "image": image,
-            "tracks": [{
-                "track_id": str(track["track_id"]),
-                "class_name": str(core_service.analysis_service.model.names[track["class_id"]]),
-                "latitude": str(track["location"]["latitude"]),
-                "longitude": str(track["location"]["longitude"]),
-                "altitude": str(track["location"]["altitude"])
-            } for track in analysis["analysis"]["tracks"]]
-        })
-
-    return jsonify({"error": "No data"})
+        feed = current_app.live_feeds[stream]
+        try:
+            rendition, track_id, quality, bitrate = frame_options()
+        except ValueError as error:
+            return jsonify({'error': str(error)}), 400
 
+        selected_quality, _ = feed.select_quality(rendition, track_id, quality, bitrate)
+        etag = f'{analysis["timestamp"].isoformat()}-{rendition}-{track_id}-{selected_quality}'
+        if etag in request.if_none_match:
+            return Response(status=304, headers={'ETag': f'"{etag}"'})
 
-def store_analysis(flight_id, analysis):
-    analysis_timestamp = analysis["timestamp"]
-
-    existing_analysis = db.session.query(FlightSnapshot).filter_by(
-        flight_id=flight_id, timestamp=analysis_timestamp
-    ).first()
-
-    if existing_analysis:
-        return
-
-    location = analysis["drone"]["location"]
-
-    drone_location = save_point(
-        latitude=location["latitude"],
-        longitude=location["longitude"],
-        altitude=location["altitude"]
-    )
-
-    drone_attitude = analysis["drone"]["attitude"]
-    gimbal_attitude = analysis["drone"]["gimbal"]
-    drone_snapshot = save_flight_snapshot(
-        flight_id=flight_id,
-        point_id=drone_location.id,
-        timestamp=analysis["timestamp"],
-        drone_attitude=[
-            drone_attitude["roll"],
-            drone_attitude["pitch"],
-            drone_attitude["yaw"]
-        ],
-        gimbal_attitude=[
-            gimbal_attitude["roll"],
-            gimbal_attitude["pitch"],
-            gimbal_attitude["yaw"]
-        ]
-    )
-
-    camera = analysis["drone"]["camera"]
-    _, compressed_image = cv2.imencode('.jpg', camera["frame"], [cv2.IMWRITE_JPEG_QUALITY, 80])
-    image_bytes = compressed_image.tobytes()
-    image = save_image(
-        flight_snapshot_id=drone_snapshot.id,
-        image_bytes=image_bytes,
-        width=camera["width"],
-        height=camera["height"],
-        fov_horizontal=camera["fov_horizontal"],
-        fov_vertical=camera["fov_vertical"]
-    )
-
-    for detection in analysis["analysis"]["tracks"]:
-        point = save_point(
-            latitude=detection["location"]["latitude"],
-            longitude=detection["location"]["longitude"],
-            altitude=detection["location"]["altitude"]
-        )
-
-        object = save_object(detection["track_id"], flight_id)
+        try:
+            image = base64.b64encode(feed.encode(analysis, rendition, track_id, quality, bitrate)).decode('utf-8')
+        except KeyError:
+            return jsonify({"error": f"Track {track_id} is not in the current frame"}), 404
 
-        x1, y1, x2, y2 = (
-            detection["frame"]["x1"],
-            detection["frame"]["y1"],
-            detection["frame"]["x2"],
-            detection["frame"]["y2"]
-        )
-        save_detection(
-            point_id=point.id,
-            image_id=image.id,
-            object_id=object.id,
-            class_name=detection["class_id"],
-            frame=f'{x1}, {y1}, {x2}, {y2}'
-        )
+        response = jsonify({**track_metadata(core_service, analysis), "image": image})
+        response.set_etag(etag)
 
+        return response
 
-def save_flight_snapshot(flight_id, point_id, timestamp, drone_attitude, gimbal_attitude):
-    drone_roll, drone_pitch, drone_yaw = drone_attitude
-    gimbal_roll, gimbal_pitch, gimbal_yaw = gimbal_attitude
-    new_snapshot = FlightSnapshot(
-        flight_id=flight_id,
-        timestamp=timestamp,
-        point_id=point_id,
-        roll=drone_roll,
-        pitch=drone_pitch,
-        yaw=drone_yaw,
-        gimbal_roll=gimbal_roll,
-        gimbal_pitch=gimbal_pitch,
-        gimbal_yaw=gimbal_yaw
-    )
-
-    db.session.add(new_snapshot)
-    db.session.commit()
-
-    return new_snapshot
-
-
-def save_image(flight_snapshot_id, image_bytes, width, height, fov_horizontal, fov_vertical):
-    new_image = Image(
-        flight_snapshot_id=flight_snapshot_id,
-        image=image_bytes,
-        width=width,
-        height=height,
-        fov_horizontal=fov_horizontal,
-        fov_vertical=fov_vertical
-    )
-
-    db.session.add(new_image)
-    db.session.commit()
-
-    return new_image
-
-
-def save_detection(point_id, image_id, object_id, class_name, frame):
-    new_detection = Detection(
-        point_id=point_id,
-        image_id=image_id,
-        object_id=object_id,
-        class_name=class_name,
-        frame=frame
-    )
-
-    db.session.add(new_detection)
-    db.session.commit()
-
-    return new_detection
-
+    return jsonify({"error": "No data"})
 
-def save_point(latitude, longitude, altitude):
-    new_point = Point(
-        latitude=latitude,
-        longitude=longitude,
-        altitude=altitude
-    )
 
-    db.session.add(new_point)
-    db.session.commit()
+@dashboard_bp.route('/live.mjpeg', methods=['GET'])
+@token_required
+@flight_active_required
+def live_frames(user_id):
+    feed = current_app.live_feeds[flight_stream(session.get('flight_id'))]
+    try:
+        options = frame_options()
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
 
-    return new_point
+    return Response(feed.frames(*options), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
-def save_object(track_id, flight_id):
-    existing_object = Object.query.filter_by(track_id=track_id, flight_id=flight_id).first()
+@dashboard_bp.route('/live-tracks', methods=['GET'])
+@token_required
+@flight_active_required
+def live_tracks(user_id):
+    feed = current_app.live_feeds[flight_stream(session.get('flight_id'))]
 
-    if existing_object:
-        return existing_object
+    return Response(feed.events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
-    new_object = Object(track_id=track_id, flight_id=flight_id)
 
-    db.session.add(new_object)
-    db.session.commit()
+@dashboard_bp.route('/pipeline-info', methods=['GET'])
+@token_required
+def pipeline_info(user_id):
+    stream_manager = current_app.stream_manager
 
-    return new_object
+    return jsonify({name: stream_manager.get(name).pipeline_info() for name in stream_manager.names()})
@@ -2,11 +2,10 @@ from datetime import datetime
 
 from flask import Blueprint, render_template, session, redirect, request, url_for, jsonify
 
-from app import core_service
 from db import db
 from models import Task, Object, Detection, Point
 from utils.jwt import token_required
-from utils.helpers import flight_active_required
+from utils.helpers import flight_active_required, flight_core_service
 
 navigation_bp = Blueprint('navigation_bp', __name__)
 
@@ -122,7 +121,7 @@ def run_task(user_id, task_id):
                 command_dictionary["COMMAND"] = "CIRCLE_AROUND"
                 command_dictionary["ARGUMENTS"]['ALTITUDE'] = float(command_dictionary["ARGUMENTS"]['HEIGHT'])
 
-        result = core_service.execute_command(command_dictionary)
+        result = flight_core_service(task.flight_id).execute_command(command_dictionary)
 
         if result == "FAILED":
             task.status = 3
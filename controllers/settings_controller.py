@@ -3,8 +3,7 @@ from flask import Blueprint, render_template, request, session, redirect, url_fo
 from db import db
 from models import Setting
 from utils.jwt import token_required
-from utils.helpers import flight_active_required
-from app import core_service
+from utils.helpers import flight_active_required, flight_core_service
 
 settings_bp = Blueprint('settings_bp', __name__)
 
@@ -33,7 +32,8 @@ def update(user_id):
         {'parameter': 'confidence', 'value': request.form['confidence']},
         {'parameter': 'exclude_classes', 'value': request.form['exclude_classes']},
         {'parameter': 'detection_limit', 'value': request.form['detection_limit']},
-        {'parameter': 'jaccard_index', 'value': request.form['jaccard_index']}
+        {'parameter': 'jaccard_index', 'value': request.form['jaccard_index']},
+        {'parameter': 'detection_interval', 'value': request.form['detection_interval']}
     ]
 
     for setting in settings:
@@ -52,12 +52,14 @@ def update(user_id):
     iou_threshold = float(settings_dict.get('jaccard_index', 0.5))
     max_detections = int(settings_dict.get('detection_limit', 100))
     classes_excluded = list(map(int, settings_dict.get('exclude_classes', '-1').split(',')))
+    detection_interval = int(settings_dict.get('detection_interval', 1))
 
-    core_service.update_settings(
+    flight_core_service(flight_id).update_settings(
         detection_threshold=detection_threshold,
         iou_threshold=iou_threshold,
         max_detections=max_detections,
-        classes_excluded=classes_excluded
+        classes_excluded=classes_excluded,
+        detection_interval=detection_interval
     )
 
     return redirect(url_for('dashboard.dashboard'))
@@ -0,0 +1,38 @@
+"""flight stream and image segments
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 18:50:12.402113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('flight', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stream', sa.String(length=64), server_default='default', nullable=False))
+
+    with op.batch_alter_table('image', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('segment', sa.String(length=128), nullable=True))
+        batch_op.add_column(sa.Column('offset', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('length', sa.Integer(), nullable=True))
+        batch_op.alter_column('image', existing_type=sa.LargeBinary(), nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('image', schema=None) as batch_op:
+        batch_op.alter_column('image', existing_type=sa.LargeBinary(), nullable=False)
+        batch_op.drop_column('length')
+        batch_op.drop_column('offset')
+        batch_op.drop_column('segment')
+
+    with op.batch_alter_table('flight', schema=None) as batch_op:
+        batch_op.drop_column('stream')
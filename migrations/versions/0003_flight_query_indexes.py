@@ -0,0 +1,67 @@
+"""flight query indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 18:31:32.891836
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def merge_duplicates(table, columns, child, foreign_key, keep='MIN'):
+    match = ' AND '.join(f'duplicate.{column} = kept.{column}' for column in columns)
+    group = ', '.join(columns)
+
+    if child is not None:
+        op.execute(
+            f'UPDATE {child} SET {foreign_key} = ('
+            f'SELECT {keep}(kept.id) FROM {table} duplicate JOIN {table} kept ON {match} '
+            f'WHERE duplicate.id = {child}.{foreign_key})'
+        )
+    op.execute(f'DELETE FROM {table} WHERE id NOT IN (SELECT {keep}(id) FROM {table} GROUP BY {group})')
+
+
+def upgrade():
+    merge_duplicates('flight_snapshot', ('flight_id', 'timestamp'), 'image', 'flight_snapshot_id')
+    merge_duplicates('object', ('flight_id', 'track_id'), 'detection', 'object_id')
+    merge_duplicates('setting', ('flight_id', 'parameter'), None, None, keep='MAX')
+
+    with op.batch_alter_table('detection', schema=None) as batch_op:
+        batch_op.create_index('ix_detection_object_id_id', ['object_id', 'id'], unique=False)
+
+    with op.batch_alter_table('flight_snapshot', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_flight_snapshot_flight_id_timestamp', ['flight_id', 'timestamp'])
+
+    with op.batch_alter_table('object', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_object_flight_id_track_id', ['flight_id', 'track_id'])
+
+    with op.batch_alter_table('setting', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_setting_flight_id_parameter', ['flight_id', 'parameter'])
+
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_task_flight_id'), ['flight_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_task_flight_id'))
+
+    with op.batch_alter_table('setting', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_setting_flight_id_parameter', type_='unique')
+
+    with op.batch_alter_table('object', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_object_flight_id_track_id', type_='unique')
+
+    with op.batch_alter_table('flight_snapshot', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_flight_snapshot_flight_id_timestamp', type_='unique')
+
+    with op.batch_alter_table('detection', schema=None) as batch_op:
+        batch_op.drop_index('ix_detection_object_id_id')
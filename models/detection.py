@@ -2,6 +2,8 @@ from db import db
 
 
 class Detection(db.Model):
+    __table_args__ = (db.Index('ix_detection_object_id_id', 'object_id', 'id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     point_id = db.Column(db.Integer, db.ForeignKey('point.id'), nullable=False)
     image_id = db.Column(db.Integer, db.ForeignKey('image.id'), nullable=False)
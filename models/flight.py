@@ -6,4 +6,5 @@ class Flight(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     start_time = db.Column(db.DateTime, nullable=False)
     end_time = db.Column(db.DateTime, nullable=True)
+    stream = db.Column(db.String(64), nullable=False, default='default', server_default='default')
     user = db.relationship('User', backref=db.backref('flights', lazy=True))
@@ -2,6 +2,8 @@ from db import db
 
 
 class FlightSnapshot(db.Model):
+    __table_args__ = (db.UniqueConstraint('flight_id', 'timestamp', name='uq_flight_snapshot_flight_id_timestamp'),)
+
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, nullable=False)
 
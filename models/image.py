@@ -4,7 +4,11 @@ from db import db
 class Image(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     flight_snapshot_id = db.Column(db.Integer, db.ForeignKey('flight_snapshot.id'), nullable=False)
-    image = db.Column(db.LargeBinary, nullable=False)
+    image = db.Column(db.LargeBinary, nullable=True)
+
+    segment = db.Column(db.String(128), nullable=True)
+    offset = db.Column(db.Integer, nullable=True)
+    length = db.Column(db.Integer, nullable=True)
 
     width = db.Column(db.Integer, nullable=False)
     height = db.Column(db.Integer, nullable=False)
@@ -2,6 +2,8 @@ from db import db
 
 
 class Object(db.Model):
+    __table_args__ = (db.UniqueConstraint('flight_id', 'track_id', name='uq_object_flight_id_track_id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     flight_id = db.Column(db.Integer, db.ForeignKey('flight.id'), nullable=False)
     track_id = db.Column(db.Integer, nullable=False)
@@ -2,6 +2,8 @@ from db import db
 
 
 class Setting(db.Model):
+    __table_args__ = (db.UniqueConstraint('flight_id', 'parameter', name='uq_setting_flight_id_parameter'),)
+
     id = db.Column(db.Integer, primary_key=True)
     flight_id = db.Column(db.Integer, db.ForeignKey('flight.id'), nullable=False)
     parameter = db.Column(db.String(64), nullable=False)
@@ -3,7 +3,7 @@ from db import db
 
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    flight_id = db.Column(db.Integer, db.ForeignKey('flight.id'), nullable=False)
+    flight_id = db.Column(db.Integer, db.ForeignKey('flight.id'), nullable=False, index=True)
     command = db.Column(db.Text, nullable=False)
     created = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.Integer, nullable=False)
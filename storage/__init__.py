@@ -0,0 +1,3 @@
+from storage.segments import SegmentStore
+from storage.writer import AnalysisWriter, store_analyses
+from storage.queries import flight_path
@@ -0,0 +1,35 @@
+from sqlalchemy import func, select
+
+from db import db
+from models import FlightSnapshot, Point
+
+
+def minute_bucket(column):
+    return func.strftime('%Y-%m-%d %H:%M', column)
+
+
+def flight_path(flight_id, since=None):
+    # one snapshot per minute: the earliest of each bucket, so a returned bucket never changes later
+    first = select(func.min(FlightSnapshot.timestamp).label('timestamp')).where(FlightSnapshot.flight_id == flight_id)
+    if since is not None:
+        first = first.where(FlightSnapshot.timestamp >= since.replace(second=0, microsecond=0))
+    first = first.group_by(minute_bucket(FlightSnapshot.timestamp))
+    if since is not None:
+        first = first.having(func.min(FlightSnapshot.timestamp) > since)
+    first = first.subquery()
+
+    query = (
+        select(FlightSnapshot.timestamp, FlightSnapshot.yaw, Point.latitude, Point.longitude, Point.altitude)
+        .join(first, FlightSnapshot.timestamp == first.c.timestamp)
+        .join(Point, Point.id == FlightSnapshot.point_id)
+        .where(FlightSnapshot.flight_id == flight_id)
+        .order_by(FlightSnapshot.timestamp)
+    )
+
+    return [{
+        'timestamp': row.timestamp.isoformat(),
+        'latitude': row.latitude,
+        'longitude': row.longitude,
+        'altitude': row.altitude,
+        'heading': row.yaw
+    } for row in db.session.execute(query)]
@@ -0,0 +1,93 @@
+import mmap
+import os
+import threading
+
+
+class SegmentStore:
+    def __init__(self, directory, segment_size=256 * 1024 * 1024, sync=False):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.sync = sync
+
+        self.lock = threading.Lock()
+        self.active = {}
+        self.maps = {}
+
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, segment):
+        return os.path.join(self.directory, segment)
+
+    def open_segment(self, flight_id, index=None):
+        flight_directory = f"flight-{flight_id}"
+        os.makedirs(self.path(flight_directory), exist_ok=True)
+
+        if index is None:
+            existing = sorted(name for name in os.listdir(self.path(flight_directory)) if name.endswith(".seg"))
+            index = int(existing[-1][:-4]) if existing else 0
+
+        segment = f"{flight_directory}/{index:06d}.seg"
+        self.active[flight_id] = (segment, index, open(self.path(segment), "ab"))
+
+        return self.active[flight_id]
+
+    def append(self, flight_id, data):
+        with self.lock:
+            segment, index, file = self.active.get(flight_id) or self.open_segment(flight_id)
+
+            if file.tell() and file.tell() + len(data) > self.segment_size:
+                file.close()
+                segment, index, file = self.open_segment(flight_id, index + 1)
+
+            offset = file.tell()
+            file.write(data)
+
+            return segment, offset, len(data)
+
+    def flush(self):
+        with self.lock:
+            for _, _, file in self.active.values():
+                file.flush()
+                if self.sync:
+                    os.fsync(file.fileno())
+
+    def read(self, segment, offset, length):
+        with self.lock:
+            mapping = self.maps.get(segment)
+
+            if mapping is None or len(mapping) < offset + length:
+                if mapping is not None:
+                    mapping.close()
+
+                with open(self.path(segment), "rb") as file:
+                    mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.maps[segment] = mapping
+
+            return mapping[offset:offset + length]
+
+    def read_image(self, image):
+        if image.segment is None:
+            return image.image
+
+        return self.read(image.segment, image.offset, image.length)
+
+    def close_flight(self, flight_id):
+        prefix = f"flight-{flight_id}/"
+
+        with self.lock:
+            active = self.active.pop(flight_id, None)
+            if active is not None:
+                active[2].close()
+
+            for segment in [segment for segment in self.maps if segment.startswith(prefix)]:
+                self.maps.pop(segment).close()
+
+    def close(self):
+        with self.lock:
+            for _, _, file in self.active.values():
+                file.close()
+            for mapping in self.maps.values():
+                mapping.close()
+
+            self.active = {}
+            self.maps = {}
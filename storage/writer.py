@@ -0,0 +1,264 @@
+import queue
+import threading
+import time
+from functools import partial
+
+from sqlalchemy import insert, select
+
+from control.encoding import DEFAULT_QUALITY, encode_image
+from db import db
+from models import Flight, Image, Detection, Point, FlightSnapshot, Object
+
+
+class AnalysisWriter:
+    def __init__(self, app, stream_manager, segment_store=None, queue_size=256, flush_interval=1.0, flush_count=32, quality=DEFAULT_QUALITY):
+        self.app = app
+        self.stream_manager = stream_manager
+        self.segment_store = segment_store
+        self.quality = quality
+        self.results = queue.Queue(maxsize=queue_size)
+
+        self.flush_interval = flush_interval
+        self.flush_count = flush_count
+        self.object_ids = {}
+        self.loaded_flights = set()
+        self.recording = None
+
+        self.written = 0
+        self.batches = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self.thread = None
+
+    def refresh(self):
+        self.recording = set(active_flights())
+
+    def start(self):
+        for name in self.stream_manager.names():
+            self.stream_manager.get(name).subscribe(partial(self.submit, name))
+
+        self.thread = threading.Thread(target=self.run, name="analysis-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, stream, analysis):
+        if self.recording is not None and stream not in self.recording:
+            self.skipped += 1
+            return
+
+        # encoded while the live feed's cache entry for this result is still hot
+        image = self.stream_manager.get(stream).encode_frame(analysis, "jpg", self.quality)
+
+        try:
+            self.results.put_nowait((stream, without_frames(analysis), image))
+        except queue.Full:
+            self.dropped += 1
+
+    def collect(self):
+        item = self.results.get()
+        if item is None:
+            return None, True
+
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.flush_count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                item = self.results.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            if item is None:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def run(self):
+        stopped = False
+        while not stopped:
+            batch, stopped = self.collect()
+            if not batch:
+                continue
+
+            with self.app.app_context():
+                self.write(batch)
+
+    def write(self, batch):
+        if self.recording is None:
+            self.refresh()
+
+        flights = active_flights({stream for stream, _, _ in batch})
+
+        analyses = [
+            (flight_id, analysis)
+            for stream, analysis, _ in batch for flight_id in flights.get(stream, ())
+        ]
+        images = [image for stream, _, image in batch for _ in flights.get(stream, ())]
+        self.skipped += sum(stream not in flights for stream, _, _ in batch)
+        if not analyses:
+            return
+
+        try:
+            object_ids = store_analyses(analyses, self.object_ids, self.loaded_flights, self.segment_store, images)
+            db.session.commit()
+        except Exception as error:
+            db.session.rollback()
+            self.failed += len(analyses)
+            print(f"Failed to store analysis batch: {error}")
+            return
+
+        self.object_ids.update(object_ids)
+        self.loaded_flights.update(flight_id for flight_id, _ in analyses)
+        self.written += len(analyses)
+        self.batches += 1
+
+    def stop(self):
+        self.results.put(None)
+        self.thread.join()
+
+    def info(self):
+        return {
+            "written": self.written,
+            "batches": self.batches,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": self.results.qsize()
+        }
+
+
+def active_flights(streams=None):
+    query = select(Flight.stream, Flight.id).where(Flight.end_time.is_(None)).order_by(Flight.id)
+    if streams is not None:
+        query = query.where(Flight.stream.in_(streams))
+
+    flights = {}
+    for stream, flight_id in db.session.execute(query):
+        flights.setdefault(stream, []).append(flight_id)
+
+    return flights
+
+
+def without_frames(analysis):
+    drone = analysis["drone"]
+
+    return {
+        **analysis,
+        "drone": {**drone, "camera": {**drone["camera"], "frame": None}},
+        "analysis": {**analysis["analysis"], "frame": None}
+    }
+
+
+def insert_returning_ids(model, rows):
+    if not rows:
+        return []
+
+    return db.session.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows).all()
+
+
+def load_object_ids(flight_ids, loaded_flights):
+    missing = set(flight_ids) - loaded_flights
+    if not missing:
+        return {}
+
+    rows = db.session.execute(
+        select(Object.flight_id, Object.track_id, Object.id).where(Object.flight_id.in_(missing))
+    ).all()
+
+    return {(flight_id, track_id): object_id for flight_id, track_id, object_id in rows}
+
+
+def located_tracks(analysis):
+    return [track for track in analysis["analysis"]["tracks"] if track["location"]["latitude"] is not None]
+
+
+def store_analyses(analyses, object_ids, loaded_flights=frozenset(), segment_store=None, images=None):
+    known_ids = {**object_ids, **load_object_ids({flight_id for flight_id, _ in analyses}, loaded_flights)}
+    tracks = [located_tracks(analysis) for _, analysis in analyses]
+
+    point_rows = []
+    for (_, analysis), analysis_tracks in zip(analyses, tracks):
+        point_rows.append(analysis["drone"]["location"])
+        point_rows.extend(track["location"] for track in analysis_tracks)
+    point_ids = iter(insert_returning_ids(Point, [
+        {"latitude": point["latitude"], "longitude": point["longitude"], "altitude": point["altitude"]}
+        for point in point_rows
+    ]))
+
+    snapshot_rows = []
+    track_points = []
+    for (flight_id, analysis), analysis_tracks in zip(analyses, tracks):
+        drone_attitude = analysis["drone"]["attitude"]
+        gimbal_attitude = analysis["drone"]["gimbal"]
+
+        snapshot_rows.append({
+            "flight_id": flight_id,
+            "point_id": next(point_ids),
+            "timestamp": analysis["timestamp"],
+            "roll": drone_attitude["roll"],
+            "pitch": drone_attitude["pitch"],
+            "yaw": drone_attitude["yaw"],
+            "gimbal_roll": gimbal_attitude["roll"],
+            "gimbal_pitch": gimbal_attitude["pitch"],
+            "gimbal_yaw": gimbal_attitude["yaw"]
+        })
+        track_points.append([next(point_ids) for _ in analysis_tracks])
+    snapshot_ids = insert_returning_ids(FlightSnapshot, snapshot_rows)
+
+    if images is None:
+        images = [encode_image(analysis["drone"]["camera"]["frame"]) for _, analysis in analyses]
+
+    image_rows = []
+    for snapshot_id, image_bytes, (flight_id, analysis) in zip(snapshot_ids, images, analyses):
+        camera = analysis["drone"]["camera"]
+
+        if segment_store is not None:
+            segment, offset, length = segment_store.append(flight_id, image_bytes)
+            image_data = {"image": None, "segment": segment, "offset": offset, "length": length}
+        else:
+            image_data = {"image": image_bytes, "segment": None, "offset": None, "length": None}
+
+        image_rows.append({
+            "flight_snapshot_id": snapshot_id,
+            **image_data,
+            "width": camera["width"],
+            "height": camera["height"],
+            "fov_horizontal": camera["fov_horizontal"],
+            "fov_vertical": camera["fov_vertical"]
+        })
+    image_ids = insert_returning_ids(Image, image_rows)
+    if segment_store is not None:
+        segment_store.flush()
+
+    new_objects = list(dict.fromkeys(
+        (flight_id, track["track_id"])
+        for (flight_id, _), analysis_tracks in zip(analyses, tracks)
+        for track in analysis_tracks
+        if (flight_id, track["track_id"]) not in known_ids
+    ))
+    created_ids = insert_returning_ids(Object, [
+        {"flight_id": flight_id, "track_id": track_id} for flight_id, track_id in new_objects
+    ])
+    known_ids.update(zip(new_objects, created_ids))
+
+    detection_rows = []
+    for image_id, points, (flight_id, _), analysis_tracks in zip(image_ids, track_points, analyses, tracks):
+        for point_id, track in zip(points, analysis_tracks):
+            frame = track["frame"]
+            detection_rows.append({
+                "point_id": point_id,
+                "image_id": image_id,
+                "object_id": known_ids[(flight_id, track["track_id"])],
+                "class_name": track["class_id"],
+                "frame": f'{frame["x1"]}, {frame["y1"]}, {frame["x2"]}, {frame["y2"]}'
+            })
+    if detection_rows:
+        db.session.execute(insert(Detection), detection_rows)
+
+    return {key: value for key, value in known_ids.items() if key not in object_ids}
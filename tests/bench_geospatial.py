@@ -0,0 +1,98 @@
+"""Benchmark ray/terrain intersection against the original stepping loop.
+
+Run from the repository root with: python -m tests.bench_geospatial
+"""
+import math
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from control.analysis.geospatial import GEOSpatial
+from tests.test_geospatial import write_dem
+
+
+def loop_find_target_location(geospatial, drone_position, direction_vector):
+    step_size = 0.1
+    max_distance = 1000
+
+    lat_step = step_size / 111320
+    lon_step = step_size / (111320 * math.cos(math.radians(drone_position.latitude)))
+
+    for i in range(1, int(max_distance / step_size)):
+        new_lat = drone_position.latitude + direction_vector[1] * lat_step * i
+        new_lon = drone_position.longitude + direction_vector[0] * lon_step * i
+        new_alt = drone_position.altitude + direction_vector[2] * step_size * i
+
+        terrain_height = geospatial.find_elevation(new_lat, new_lon)
+
+        if new_alt <= terrain_height:
+            return new_lat, new_lon, terrain_height
+
+    return None
+
+
+def location_errors(geospatial, expected_results, results):
+    errors = []
+    for expected, result in zip(expected_results, results):
+        if expected is None or result is None:
+            errors.append(0.0 if expected is result else math.inf)
+            continue
+        errors.append(geospatial.distance_between_locations(*expected, *result))
+
+    return errors
+
+
+def synthetic_elevation(size=1201):
+    y, x = np.mgrid[0:size, 0:size] / size * 2 * math.pi
+    elevation = 600 + 80 * np.sin(3 * x) * np.cos(2 * y) + 30 * np.sin(11 * x + 7 * y)
+
+    return elevation.astype(np.int16)
+
+
+def benchmark(function, geospatial, drone_position, rays):
+    results = []
+    start = time.perf_counter()
+    for direction_vector in rays:
+        results.append(function(geospatial, drone_position, direction_vector))
+    elapsed = time.perf_counter() - start
+
+    return results, elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        dem_path = os.path.join(directory, "synthetic.tif")
+        write_dem(dem_path, synthetic_elevation())
+
+        drone_position = SimpleNamespace(latitude=-35.15, longitude=149.15, altitude=800.0)
+        rays = []
+        for pitch in np.radians([-10, -15, -20, -30, -45, -60, -90]):
+            for yaw in np.radians([0, 90, 180, 270]):
+                rays.append(np.array([math.cos(pitch) * math.sin(yaw), math.cos(pitch) * math.cos(yaw), math.sin(pitch)]))
+
+        loop_geospatial = GEOSpatial(dem_path)
+        loop_results, loop_elapsed = benchmark(loop_find_target_location, loop_geospatial, drone_position, rays)
+
+        geospatial = GEOSpatial(dem_path)
+        results, elapsed = benchmark(GEOSpatial.find_target_location, geospatial, drone_position, rays)
+
+        batch_start = time.perf_counter()
+        batch_results = geospatial.find_target_locations(drone_position, rays)
+        batch_elapsed = time.perf_counter() - batch_start
+
+        errors = location_errors(geospatial, loop_results, results)
+        batch_errors = location_errors(geospatial, results, batch_results)
+
+    print(f"Rays: {len(rays)}")
+    print(f"Loop:       {loop_elapsed / len(rays) * 1000:.3f} ms per ray")
+    print(f"Vectorized: {elapsed / len(rays) * 1000:.3f} ms per ray")
+    print(f"Batched:    {batch_elapsed / len(rays) * 1000:.3f} ms per ray ({len(rays)} rays per call)")
+    print(f"Speedup:    {loop_elapsed / elapsed:.1f}x, batched {loop_elapsed / batch_elapsed:.1f}x")
+    print(f"Max location difference: {max(errors):.3f} m, batched to single {max(batch_errors):.3f} m")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+def create_analysis(track_ids=(1, 2), seconds=0, shape=(48, 64, 3), value=0):
+    frame = np.full(shape, value, dtype=np.uint8)
+
+    return {
+        "timestamp": datetime(2024, 5, 1, 12, 0, 0) + timedelta(seconds=seconds),
+        "fps": 12.345,
+        "drone": {
+            "location": {"latitude": 50.0, "longitude": 30.0, "altitude": 100.0},
+            "attitude": {"roll": 0.0, "pitch": 0.0, "yaw": 90.0},
+            "gimbal": {"roll": 0.0, "pitch": -1.5, "yaw": 0.0},
+            "camera": {
+                "frame": frame,
+                "width": shape[1], "height": shape[0], "fov_horizontal": 1.0, "fov_vertical": 0.8
+            }
+        },
+        "analysis": {
+            "tracks": [{
+                "track_id": track_id,
+                "class_id": 3,
+                "location": {"latitude": 50.001, "longitude": 30.001, "altitude": 90.0},
+                "frame": {"x1": 100, "y1": 100, "x2": 200, "y2": 140}
+            } for track_id in track_ids],
+            "frame": frame
+        }
+    }
@@ -6,13 +6,17 @@ from control.analysis.analysist import DroneAnalysisService
 
 class TestDroneAnalysisService(unittest.TestCase):
 
-    @patch('control.analysis.analysist.YOLO')
+    @patch('control.analysis.inference.YOLO')
     @patch('control.analysis.analysist.ResNetConfiguration')
     @patch('control.analysis.analysist.Extractor')
     @patch('control.analysis.analysist.Tracker')
     @patch('control.analysis.analysist.GEOSpatial')
     def setUp(self, MockGEOSpatial, MockTracker, MockExtractor, MockResNetConfig, MockYOLO):
         self.mock_yolo = MockYOLO.return_value
+        self.mock_result = MagicMock()
+        self.mock_result.boxes.data.cpu.return_value.numpy.return_value = np.empty((0, 6), dtype=np.float32)
+        self.mock_yolo.predict.return_value = [self.mock_result]
+        self.MockGEOSpatial = MockGEOSpatial
         self.mock_geospatial = MockGEOSpatial.return_value
         self.mock_tracker = MockTracker.return_value
 
@@ -21,15 +25,31 @@ class TestDroneAnalysisService(unittest.TestCase):
             dem_path="control/analysis/S36E149.hgt"
         )
 
+    def test_dem_options(self):
+        self.MockGEOSpatial.assert_called_once_with(
+            "control/analysis/S36E149.hgt", tolerance=0.1, cache_size=64 * 1024 * 1024
+        )
+
     def test_predict(self):
         frame = np.zeros((480, 640, 3))
         detections = self.service.predict(frame)
-        expected_detections = []
-        self.assertEqual(detections, expected_detections)
+        self.assertEqual(detections.shape, (0, 6))
+
+    def test_predict_filters_detections(self):
+        self.mock_result.boxes.data.cpu.return_value.numpy.return_value = np.array([
+            [100, 200, 300, 400, 0.9, 0],
+            [110, 210, 310, 410, 0.1, 0],
+            [120, 220, 320, 420, 0.8, 3]
+        ], dtype=np.float32)
+        self.service.classes = [0, 1]
+
+        detections = self.service.predict(np.zeros((480, 640, 3)))
+
+        np.testing.assert_allclose(detections, [[100, 200, 300, 400, 0.9, 0]], rtol=1e-6)
 
     def test_update_tracker(self):
         frame = np.zeros((480, 640, 3))
-        detections = [[100, 200, 300, 400, 0.9, 0]]
+        detections = np.array([[100, 200, 300, 400, 0.9, 0]])
         mock_track = MagicMock()
         mock_track.to_tlbr.return_value = [100, 200, 300, 400]
         mock_track.track_id = 1
@@ -39,6 +59,32 @@ class TestDroneAnalysisService(unittest.TestCase):
         tracks = self.service.update_tracker(frame, detections)
         self.assertEqual(tracks, [mock_track])
 
+    def test_propagate_tracker(self):
+        mock_track = MagicMock()
+        self.mock_tracker.tracks = [mock_track]
+
+        tracks = self.service.propagate_tracker()
+
+        self.mock_tracker.predict.assert_called_once_with()
+        self.assertEqual(tracks, [mock_track])
+
+    def test_tracks_stable(self):
+        mock_track = MagicMock()
+        mock_track.is_tentative.return_value = False
+
+        self.mock_tracker.tracks = []
+        self.service.propagate_tracker()
+        self.assertFalse(self.service.tracks_stable())
+
+        self.mock_tracker.tracks = [mock_track]
+        self.assertFalse(self.service.tracks_stable())
+        self.service.update_tracker(np.zeros((480, 640, 3)), np.zeros((1, 6)))
+        self.assertTrue(self.service.tracks_stable())
+
+        mock_track.is_tentative.return_value = True
+        self.service.propagate_tracker()
+        self.assertFalse(self.service.tracks_stable())
+
     def test_geospatial_analysis(self):
         mock_track = MagicMock()
         mock_track.to_tlbr.return_value = [100, 200, 300, 400]
@@ -64,9 +110,9 @@ class TestDroneAnalysisService(unittest.TestCase):
         global_position_data.longitude = 0.0
         global_position_data.altitude = 0.0
 
-        self.mock_geospatial.detection_angles.return_value = (0.0, 0.0)
-        self.mock_geospatial.calculate_direction_vector.return_value = (0.0, 0.0, 0.0)
-        self.mock_geospatial.find_target_location.return_value = (0.0, 0.0, 0.0)
+        self.mock_geospatial.detection_angles.return_value = (np.array([0.0]), np.array([0.0]))
+        self.mock_geospatial.calculate_direction_vector.return_value = np.array([[0.0, 0.0, 0.0]])
+        self.mock_geospatial.find_target_locations.return_value = [(0.0, 0.0, 0.0)]
 
         tracks_locations = self.service.geospatial_analysis(
             tracks, image_width, image_height, fov_horizontal, fov_vertical,
@@ -75,6 +121,18 @@ class TestDroneAnalysisService(unittest.TestCase):
 
         expected_locations = {1: (0.0, 0.0, 0.0)}
         self.assertEqual(tracks_locations, expected_locations)
+        self.mock_geospatial.find_target_locations.assert_called_once()
+
+    def test_geospatial_analysis_without_tracks(self):
+        gimbal_data = MagicMock()
+        gimbal_data.quaternion.to_euler.return_value = (0.0, 0.0, 0.0)
+
+        tracks_locations = self.service.geospatial_analysis(
+            [], 640, 480, 1.0, 1.0, gimbal_data, MagicMock(roll=0.0, pitch=0.0), MagicMock(heading=0.0)
+        )
+
+        self.assertEqual(tracks_locations, {})
+        self.mock_geospatial.find_target_locations.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -36,6 +36,17 @@ class TestDroneDataService(unittest.TestCase):
         self.assertEqual(mavlink_data["position"], "position_data")
         self.assertEqual(mavlink_data["gimbal"], "gimbal_data")
 
+    @patch('control.communication.communicator.DroneData')
+    def test_get_drone_data_multipart(self, MockDroneData):
+        self.service.wire_format = "multipart"
+        self.mock_stream_receiver.get_data.return_value = ["header", "camera"]
+
+        drone_data = self.service.get_drone_data()
+
+        MockDroneData.from_multipart.assert_called_once_with(["header", "camera"], self.service.sensors)
+        MockDroneData.from_json.assert_not_called()
+        self.assertEqual(drone_data, MockDroneData.from_multipart.return_value)
+
 
 if __name__ == '__main__':
     unittest.main()
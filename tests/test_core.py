@@ -1,6 +1,7 @@
 import math
 import unittest
 from unittest.mock import patch, MagicMock
+import numpy as np
 from control.core import DroneCoreService
 
 
@@ -19,6 +20,7 @@ class TestDroneCoreService(unittest.TestCase):
             model_path="control/analysis/yolov8n-visdrone.pt",
             dem_path="control/analysis/S36E149.hgt"
         )
+        self.core_service.shutdown()
 
     def test_start_and_stop_analysis(self):
         self.core_service.start_analysis()
@@ -54,6 +56,21 @@ class TestDroneCoreService(unittest.TestCase):
         self.assertEqual(fov_horizontal, 1.0)
         self.assertEqual(fov_vertical, 2 * math.atan(math.tan(1.0 / 2) * (480 / 640)))
 
+    def test_get_drone_data_skips_repeated_frame(self):
+        mock_drone_data = MagicMock()
+        mock_drone_data.camera.width = 640
+        mock_drone_data.camera.height = 480
+        mock_drone_data.camera.fov = 1.0
+        self.mock_data_service.get_drone_data.return_value = mock_drone_data
+
+        self.assertIsNotNone(self.core_service.get_drone_data())
+        self.assertIsNone(self.core_service.get_drone_data())
+
+    def test_get_drone_data_without_frame(self):
+        self.mock_data_service.get_drone_data.return_value = None
+
+        self.assertIsNone(self.core_service.get_drone_data())
+
     def test_get_mavlink_data(self):
         self.mock_data_service.get_mavlink_data.return_value = {
             "gimbal": "gimbal_data",
@@ -66,9 +83,137 @@ class TestDroneCoreService(unittest.TestCase):
         self.assertEqual(attitude, "attitude_data")
         self.assertEqual(global_position, "position_data")
 
-    # def tearDown(self):
-    #     self.core_service.stop_analysis()
-    #     self.core_service.analysis_thread.join()
+    def test_pipeline_stages(self):
+        frame = MagicMock()
+        track = MagicMock()
+        track.to_tlbr.return_value = [10.0, 20.0, 30.0, 40.0]
+        track.track_id = 7
+        track.class_id = 2
+
+        self.mock_analysis_service.predict.return_value = np.array([[10, 20, 30, 40, 0.9, 2]])
+        self.mock_analysis_service.update_tracker.return_value = [track]
+        self.mock_analysis_service.geospatial_analysis.return_value = {7: (1.0, 2.0, 3.0)}
+
+        work = {
+            "result": {
+                "drone": {
+                    "camera": {"frame": frame, "width": 640, "height": 480, "fov_horizontal": 1.0, "fov_vertical": 0.8},
+                    "attitude": {"roll": 0.0, "pitch": 0.0, "yaw": 0.0},
+                    "gimbal": {"roll": 0.0, "pitch": 0.0, "yaw": 0.0}
+                },
+                "analysis": {"tracks": [], "frame": None}
+            },
+            "received": 0.0,
+            "mavlink": (MagicMock(), MagicMock(), MagicMock())
+        }
+
+        subscriber = MagicMock()
+        self.core_service.subscribe(subscriber)
+
+        with patch.object(self.core_service, 'paint_info') as mock_paint_info:
+            self.core_service.render(self.core_service.track(self.core_service.detect(work)))
+
+        mock_paint_info.assert_called_once_with(frame, [10, 20, 30, 40], 7)
+        self.assertIs(self.core_service.get_analysis(), work["result"])
+        subscriber.assert_called_once_with(work["result"])
+        self.assertIs(work["result"]["analysis"]["frame"], frame)
+        self.assertEqual(work["result"]["analysis"]["tracks"][0]["location"]["altitude"], 3.0)
+        self.assertEqual(len(self.core_service.result_latencies), 1)
+
+    def create_work(self, yaw=0.0):
+        return {
+            "result": {
+                "drone": {
+                    "camera": {"frame": MagicMock(), "width": 640, "height": 480, "fov_horizontal": 1.0, "fov_vertical": 0.8},
+                    "attitude": {"roll": 0.0, "pitch": 0.0, "yaw": yaw},
+                    "gimbal": {"roll": 0.0, "pitch": 0.0, "yaw": 0.0}
+                }
+            }
+        }
+
+    def test_detection_interval(self):
+        self.core_service.update_settings(0.5, 0.5, 100, [-1], detection_interval=3)
+        self.mock_analysis_service.tracks_stable.return_value = True
+
+        detections = [self.core_service.detect(self.create_work())["detections"] for _ in range(6)]
+
+        self.assertEqual(self.mock_analysis_service.predict.call_count, 2)
+        self.assertEqual([item is None for item in detections], [False, True, True, False, True, True])
+
+    def test_detection_on_unstable_tracks_or_motion(self):
+        self.core_service.update_settings(0.5, 0.5, 100, [-1], detection_interval=10)
+        self.mock_analysis_service.tracks_stable.return_value = True
+        self.core_service.detect(self.create_work())
+
+        self.assertIsNone(self.core_service.detect(self.create_work(yaw=1.0))["detections"])
+        self.assertIsNotNone(self.core_service.detect(self.create_work(yaw=20.0))["detections"])
+
+        self.mock_analysis_service.tracks_stable.return_value = False
+        self.assertIsNotNone(self.core_service.detect(self.create_work(yaw=20.0))["detections"])
+
+    def test_track_propagates_without_detections(self):
+        self.mock_analysis_service.propagate_tracker.return_value = []
+        self.mock_analysis_service.geospatial_analysis.return_value = {}
+
+        work = self.create_work()
+        work["result"]["analysis"] = {"tracks": [], "frame": None}
+        work["mavlink"] = (MagicMock(), MagicMock(), MagicMock())
+        work["detections"] = None
+
+        self.core_service.track(work)
+
+        self.mock_analysis_service.propagate_tracker.assert_called_once()
+        self.mock_analysis_service.update_tracker.assert_not_called()
+
+    def test_render_stage_counts_results(self):
+        render_stage = self.core_service.stages[-1]
+
+        with patch.object(self.core_service, 'paint_info'):
+            for _ in range(3):
+                work = self.create_work()
+                work["result"]["analysis"] = {"tracks": [], "frame": None}
+                work["received"] = 0.0
+                render_stage.process(work)
+
+        info = self.core_service.pipeline_info()["stages"]["render"]
+        self.assertEqual(info["processed"], 3)
+        self.assertEqual(info["skipped"], 0)
+        self.assertGreater(info["fps"], 0.0)
+        self.assertGreater(self.core_service.get_analysis()["fps"], 0.0)
+
+    def test_pipeline_info_reports_elevation_cache(self):
+        self.mock_analysis_service.geospatial.cache_info.return_value = {"mode": "memmap", "lookups": 4, "size_bytes": 8}
+
+        info = self.core_service.pipeline_info()
+
+        self.assertEqual(info["elevation_cache"], {"mode": "memmap", "lookups": 4, "size_bytes": 8})
+        self.assertIs(info["stream"], self.mock_data_service.stream_receiver.stream_info.return_value)
+        self.assertIn("track", info["stages"])
+
+    def test_track_without_ground_hit(self):
+        track = MagicMock()
+        track.to_tlbr.return_value = [10.0, 20.0, 30.0, 40.0]
+        track.track_id = 7
+        self.mock_analysis_service.update_tracker.return_value = [track]
+        self.mock_analysis_service.geospatial_analysis.return_value = {7: None}
+
+        work = self.create_work()
+        work["result"]["analysis"] = {"tracks": [], "frame": None}
+        work["mavlink"] = (MagicMock(), MagicMock(), MagicMock())
+        work["detections"] = np.zeros((1, 6))
+
+        self.core_service.track(work)
+
+        self.assertEqual(
+            work["result"]["analysis"]["tracks"][0]["location"],
+            {"latitude": None, "longitude": None, "altitude": None}
+        )
+
+    def test_shutdown_stops_workers(self):
+        for stage in [self.core_service.ingest_stage] + self.core_service.stages:
+            self.assertFalse(stage.thread.is_alive())
+
+        self.assertFalse(self.core_service.running)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,116 @@
+import threading
+import time
+import unittest
+
+import zmq
+
+from control.communication.data_stream import StreamReceiver
+
+
+class TestStreamReceiverStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.context = zmq.Context()
+
+    def tearDown(self):
+        self.receiver.close()
+        self.sender.close()
+        self.context.term()
+
+    def wait_for_connection(self, message):
+        deadline = time.time() + 5
+        while self.receiver.sequence == 0 and time.time() < deadline:
+            self.sender.send_json(message)
+            time.sleep(0.01)
+
+    def test_subscribe_keeps_newest(self):
+        self.sender = self.context.socket(zmq.PUB)
+        port = self.sender.bind_to_random_port("tcp://127.0.0.1")
+        self.receiver = StreamReceiver("127.0.0.1", port, mode="subscribe")
+
+        self.wait_for_connection({"frame": -1})
+        for frame in range(5):
+            self.sender.send_json({"frame": frame})
+
+        deadline = time.time() + 5
+        while self.receiver.latest != {"frame": 4} and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.receiver.get_data(), {"frame": 4})
+        self.assertIsNone(self.receiver.get_latest(timeout=0.05))
+        self.assertGreater(self.receiver.stream_info()["received"], 0)
+
+    def test_pull_multipart(self):
+        self.sender = self.context.socket(zmq.PUSH)
+        port = self.sender.bind_to_random_port("tcp://127.0.0.1")
+        self.receiver = StreamReceiver("127.0.0.1", port, wire_format="multipart", mode="pull")
+
+        self.sender.send_multipart([b"header", b"camera"])
+
+        frames = self.receiver.get_data()
+
+        self.assertEqual([frame.bytes for frame in frames], [b"header", b"camera"])
+
+    def test_retries_failed_connect(self):
+        self.sender = self.context.socket(zmq.PUB)
+        port = self.sender.bind_to_random_port("tcp://127.0.0.1")
+        self.receiver = StreamReceiver(
+            "invalid host", port, mode="subscribe", receive_timeout=100,
+            reconnect_interval=0.01, max_reconnect_interval=0.05
+        )
+
+        self.assertIsNone(self.receiver.get_latest(timeout=0.1))
+        self.assertTrue(self.receiver.receive_thread.is_alive())
+        self.assertGreater(self.receiver.stream_info()["reconnects"], 0)
+
+        self.receiver.host = "127.0.0.1"
+        self.wait_for_connection({"frame": 1})
+
+        self.assertEqual(self.receiver.get_data(), {"frame": 1})
+
+
+class TestStreamReceiverRecovery(unittest.TestCase):
+
+    def setUp(self):
+        self.context = zmq.Context()
+        self.server = self.context.socket(zmq.REP)
+        port = self.server.bind_to_random_port("tcp://127.0.0.1")
+
+        self.receiver = StreamReceiver("127.0.0.1", port, receive_timeout=100, reconnect_interval=0.01)
+
+    def tearDown(self):
+        self.receiver.close()
+        self.server.close(linger=0)
+        self.context.term()
+
+    def serve(self, replies):
+        for reply in replies:
+            self.server.recv()
+            if reply is None:
+                time.sleep(0.3)
+                reply = {"frame": "late"}
+            self.server.send_json(reply)
+
+    def test_timeout_and_reconnect(self):
+        server_thread = threading.Thread(target=self.serve, args=([None, {"frame": 1}],))
+        server_thread.start()
+
+        self.assertIsNone(self.receiver.get_data())
+
+        data = None
+        deadline = time.time() + 5
+        while data is None and time.time() < deadline:
+            data = self.receiver.get_data()
+        server_thread.join()
+
+        self.assertEqual(data, {"frame": 1})
+
+        stream_info = self.receiver.stream_info()
+        self.assertGreaterEqual(stream_info["timeouts"], 1)
+        self.assertEqual(stream_info["reconnects"], stream_info["timeouts"])
+        self.assertEqual(stream_info["received"], 1)
+        self.assertEqual(self.receiver.reconnect_delay, self.receiver.reconnect_interval)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import unittest
+from functools import partial
+
+import numpy as np
+import zmq
+
+from control.communication.drone_data import (
+    CameraData, RangefinderData, FDMData, GimbalAxisData, GimbalData, DroneData
+)
+
+
+def create_drone_data():
+    random = np.random.default_rng(0)
+
+    axis = GimbalAxisData(min=-1.0, max=1.0, current=0.0, target=0.0)
+
+    return DroneData(
+        timestamp=1.5,
+        fdm=FDMData(1.5, [0.0, 0.0, 0.0], [0.0, 0.0, 9.8], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 100.0]),
+        gimbal=GimbalData(timestamp=1.5, roll=axis, pitch=axis, yaw=axis),
+        camera=CameraData(1, 64, 48, 30.0, 1.2, "uint8", random.integers(0, 255, (48, 64, 3), dtype=np.uint8)),
+        depth=RangefinderData(1, 64, 48, 30.0, 1.2, 0.1, 100.0, "uint16", random.integers(0, 6000, (48, 64), dtype=np.uint16)),
+        rangefinder=RangefinderData(1, 64, 48, 30.0, 1.2, 0.1, 100.0, "uint8", random.integers(0, 255, (48, 64), dtype=np.uint8))
+    )
+
+
+class TestDroneDataMultipart(unittest.TestCase):
+
+    def setUp(self):
+        self.drone_data = create_drone_data()
+
+    def test_header(self):
+        frames = self.drone_data.to_multipart()
+        header = json.loads(frames[0])
+
+        self.assertEqual(len(frames), 4)
+        self.assertEqual(header["frames"], ["camera", "depth", "rangefinder"])
+        self.assertEqual(header["camera"]["encoding"], "jpg")
+        self.assertNotIn("frame", header["camera"])
+        self.assertEqual(header["gimbal"]["roll"]["max"], 1.0)
+
+    def test_lossless_round_trip(self):
+        frames = self.drone_data.to_multipart({"camera": "raw", "rangefinder": "raw"})
+
+        drone_data = DroneData.from_multipart(frames)
+
+        self.assertEqual(drone_data.timestamp, 1.5)
+        self.assertEqual(drone_data.fdm, self.drone_data.fdm)
+        self.assertEqual(drone_data.gimbal, self.drone_data.gimbal)
+        np.testing.assert_array_equal(drone_data.camera.frame, self.drone_data.camera.frame)
+        np.testing.assert_array_equal(drone_data.depth.frame, self.drone_data.depth.frame)
+        np.testing.assert_array_equal(drone_data.rangefinder.frame, self.drone_data.rangefinder.frame)
+
+    def test_compressed_camera(self):
+        drone_data = DroneData.from_multipart(self.drone_data.to_multipart())
+
+        self.assertEqual(drone_data.camera.frame.shape, (48, 64, 3))
+        self.assertEqual(drone_data.depth.frame.dtype, np.uint16)
+
+    def test_zero_copy_transport(self):
+        context = zmq.Context()
+        sender = context.socket(zmq.PAIR)
+        receiver = context.socket(zmq.PAIR)
+        sender.bind("inproc://drone-data")
+        receiver.connect("inproc://drone-data")
+
+        try:
+            sender.send_multipart(self.drone_data.to_multipart({"camera": "raw"}), copy=False)
+            frames = receiver.recv_multipart(copy=False)
+
+            drone_data = DroneData.from_multipart(frames)
+
+            np.testing.assert_array_equal(drone_data.camera.frame, self.drone_data.camera.frame)
+            self.assertTrue(drone_data.camera.frame.flags.writeable)
+        finally:
+            sender.close()
+            receiver.close()
+            context.term()
+
+
+class TestDroneDataLazyDecoding(unittest.TestCase):
+
+    def setUp(self):
+        self.drone_data = create_drone_data()
+
+    def test_json_sensors_decoded_on_access(self):
+        drone_data = DroneData.from_json(self.drone_data.to_json())
+
+        self.assertIsInstance(drone_data.__dict__["camera"], partial)
+        self.assertIsInstance(drone_data.__dict__["depth"], partial)
+
+        camera = drone_data.camera
+
+        self.assertIsInstance(camera, CameraData)
+        self.assertIs(drone_data.camera, camera)
+        self.assertIsInstance(drone_data.__dict__["depth"], partial)
+
+    def test_multipart_sensors_decoded_on_access(self):
+        drone_data = DroneData.from_multipart(self.drone_data.to_multipart())
+
+        self.assertIsInstance(drone_data.__dict__["rangefinder"], partial)
+        np.testing.assert_array_equal(drone_data.rangefinder.frame, self.drone_data.rangefinder.frame)
+        self.assertIsInstance(drone_data.__dict__["rangefinder"], RangefinderData)
+
+    def test_sensor_subscription(self):
+        drone_data = DroneData.from_multipart(self.drone_data.to_multipart(), sensors=("camera",))
+
+        self.assertIsNotNone(drone_data.camera)
+        self.assertIsNone(drone_data.depth)
+        self.assertIsNone(drone_data.rangefinder)
+
+    def test_partial_multipart(self):
+        camera_only = DroneData(
+            timestamp=self.drone_data.timestamp,
+            fdm=self.drone_data.fdm,
+            gimbal=self.drone_data.gimbal,
+            camera=self.drone_data.camera
+        )
+        frames = camera_only.to_multipart()
+
+        drone_data = DroneData.from_multipart(frames)
+
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(drone_data.camera.frame.shape, (48, 64, 3))
+        self.assertIsNone(drone_data.depth)
+
+
+if __name__ == '__main__':
+    unittest.main()
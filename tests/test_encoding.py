@@ -0,0 +1,144 @@
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from control.encoding import AdaptiveQuality, FrameCache, crop_track, encode_image, render_frame
+from tests.fixtures import create_analysis
+
+
+class TestFrameCache(unittest.TestCase):
+
+    def test_encode_once_per_key(self):
+        cache = FrameCache()
+        analysis = create_analysis()
+
+        first = cache.encode(analysis, "jpg", 70)
+        second = cache.encode(analysis, "jpg", 70)
+        other = cache.encode(analysis, "jpg", 90)
+
+        self.assertIs(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(cache.info(), {"hits": 1, "misses": 2, "results": 1})
+
+    def test_concurrent_encode(self):
+        cache = FrameCache()
+        analysis = create_analysis()
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(cache.encode(analysis))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(cache.info()["misses"], 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_keeps_last_results(self):
+        cache = FrameCache(size=2)
+        analyses = [create_analysis(seconds=seconds) for seconds in range(3)]
+
+        for analysis in analyses:
+            cache.encode(analysis)
+        cache.encode(analyses[2])
+        cache.encode(analyses[0])
+
+        self.assertEqual(cache.info(), {"hits": 1, "misses": 4, "results": 2})
+
+    def test_late_results_do_not_evict_live_ones(self):
+        cache = FrameCache(size=2)
+        analyses = [create_analysis(seconds=seconds) for seconds in range(3)]
+
+        for analysis in analyses[1:]:
+            cache.encode(analysis)
+        cache.encode(analyses[0])
+        cache.encode(analyses[1])
+        cache.encode(analyses[2])
+
+        self.assertEqual(cache.info(), {"hits": 2, "misses": 3, "results": 2})
+
+    def test_default_keeps_a_few_results(self):
+        cache = FrameCache()
+
+        for seconds in range(10):
+            cache.encode(create_analysis(seconds=seconds), rendition="thumb")
+
+        self.assertEqual(cache.info()["results"], 4)
+
+    def test_encode_image(self):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+        self.assertEqual(encode_image(frame)[:2], b'\xff\xd8')
+        self.assertEqual(encode_image(frame, "webp", 50)[:4], b'RIFF')
+
+
+class TestRenditions(unittest.TestCase):
+
+    def setUp(self):
+        self.analysis = create_analysis(shape=(480, 640, 3))
+
+    def test_renditions(self):
+        self.assertIs(render_frame(self.analysis), self.analysis["analysis"]["frame"])
+        self.assertEqual(render_frame(self.analysis, "half").shape, (240, 320, 3))
+        self.assertEqual(render_frame(self.analysis, "thumb").shape, (120, 160, 3))
+
+        with self.assertRaises(ValueError):
+            render_frame(self.analysis, "poster")
+
+    def test_crop_track(self):
+        crop = crop_track(self.analysis["analysis"]["frame"], self.analysis["analysis"]["tracks"], 1)
+
+        self.assertEqual(crop.shape, (64, 150, 3))
+        np.testing.assert_array_equal(crop, self.analysis["analysis"]["frame"][88:152, 75:225])
+
+        with self.assertRaises(KeyError):
+            crop_track(self.analysis["analysis"]["frame"], self.analysis["analysis"]["tracks"], 8)
+
+    def test_crop_track_clipped_to_frame(self):
+        tracks = [{"track_id": 1, "frame": {"x1": 0, "y1": 0, "x2": 20, "y2": 20}}]
+
+        self.assertEqual(crop_track(self.analysis["analysis"]["frame"], tracks, 1).shape, (42, 42, 3))
+
+    def test_cache_keys_renditions(self):
+        cache = FrameCache()
+
+        thumb = cache.encode(self.analysis, rendition="thumb")
+        crop = cache.encode(self.analysis, rendition="half", track_id=1)
+
+        self.assertNotEqual(thumb, crop)
+        self.assertIs(cache.encode(self.analysis, rendition="thumb"), thumb)
+
+
+class TestAdaptiveQuality(unittest.TestCase):
+
+    def test_quality_follows_target_bitrate(self):
+        controller = AdaptiveQuality(target_bitrate=80000, quality=80)
+        start = datetime(2024, 5, 1, 12, 0, 0)
+
+        controller.update(start, 50000)
+        self.assertEqual(controller.quality, 80)
+
+        controller.update(start + timedelta(seconds=1), 50000)
+        self.assertEqual(controller.quality, 70)
+
+        controller.update(start + timedelta(seconds=1), 50000)
+        self.assertEqual(controller.quality, 70)
+
+        for second in range(2, 20):
+            controller.update(start + timedelta(seconds=second), 1000)
+        self.assertEqual(controller.quality, 90)
+
+    def test_quality_is_bounded(self):
+        controller = AdaptiveQuality(target_bitrate=1000, quality=40, min_quality=30)
+        start = datetime(2024, 5, 1, 12, 0, 0)
+
+        for second in range(5):
+            controller.update(start + timedelta(seconds=second), 100000)
+
+        self.assertEqual(controller.quality, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
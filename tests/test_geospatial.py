@@ -0,0 +1,216 @@
+import math
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from control.analysis.geospatial import GEOSpatial
+
+
+def write_dem(path, elevation, left=149.0, top=-35.0, resolution=1 / 3600):
+    with rasterio.open(
+        path, "w",
+        driver="GTiff",
+        height=elevation.shape[0],
+        width=elevation.shape[1],
+        count=1,
+        dtype=elevation.dtype,
+        crs="EPSG:4326",
+        transform=from_origin(left, top, resolution, resolution)
+    ) as dst:
+        dst.write(elevation, 1)
+
+
+class TestGEOSpatial(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dem_path = os.path.join(self.directory.name, "flat.tif")
+        write_dem(self.dem_path, np.full((360, 360), 100, dtype=np.int16))
+
+        self.geospatial = GEOSpatial(self.dem_path)
+        self.drone_position = SimpleNamespace(latitude=-35.05, longitude=149.05, altitude=200.0)
+
+    def tearDown(self):
+        self.geospatial.src.close()
+        self.directory.cleanup()
+
+    def test_find_elevation(self):
+        self.assertEqual(self.geospatial.find_elevation(-35.05, 149.05), 100.0)
+
+    def test_find_elevation_array(self):
+        elevations = self.geospatial.find_elevation(np.array([-35.05, -35.06]), np.array([149.05, 149.06]))
+        np.testing.assert_array_equal(elevations, [100, 100])
+
+    def test_find_elevation_outside_dem(self):
+        elevations = self.geospatial.find_elevation(np.array([-36.5]), np.array([149.05]))
+        self.assertTrue(np.isnan(elevations[0]))
+
+    def test_find_target_location(self):
+        pitch = math.radians(-45)
+        direction_vector = np.array([0.0, math.cos(pitch), math.sin(pitch)])
+
+        latitude, longitude, altitude = self.geospatial.find_target_location(self.drone_position, direction_vector)
+
+        distance = self.geospatial.distance_between_locations(
+            self.drone_position.latitude, self.drone_position.longitude, 100.0,
+            latitude, longitude, 100.0
+        )
+        self.assertAlmostEqual(distance, 100.0, delta=0.5)
+        self.assertAlmostEqual(longitude, self.drone_position.longitude)
+        self.assertEqual(altitude, 100.0)
+
+    def test_find_target_location_above_horizon(self):
+        direction_vector = np.array([0.0, math.cos(0.1), math.sin(0.1)])
+
+        self.assertIsNone(self.geospatial.find_target_location(self.drone_position, direction_vector))
+
+    def test_calculate_direction_vector_batch(self):
+        view_angles = (0.1, -0.5, 0.3)
+        detection_offsets = (np.array([0.0, 0.2, -0.1]), np.array([0.0, -0.1, 0.05]))
+
+        direction_vectors = self.geospatial.calculate_direction_vector(view_angles, detection_offsets)
+
+        self.assertEqual(direction_vectors.shape, (3, 3))
+        for direction_vector, theta_x, theta_y in zip(direction_vectors, *detection_offsets):
+            np.testing.assert_allclose(
+                direction_vector,
+                self.geospatial.calculate_direction_vector(view_angles, (theta_x, theta_y))
+            )
+
+    def test_find_target_locations(self):
+        pitches = np.radians([-30, -45, -90, 10])
+        direction_vectors = np.stack([np.zeros(4), np.cos(pitches), np.sin(pitches)], axis=1)
+
+        target_locations = self.geospatial.find_target_locations(self.drone_position, direction_vectors)
+
+        self.assertEqual(len(target_locations), 4)
+        self.assertIsNone(target_locations[3])
+        for target_location, direction_vector in zip(target_locations[:3], direction_vectors[:3]):
+            expected = self.geospatial.find_target_location(self.drone_position, direction_vector)
+            np.testing.assert_allclose(target_location, expected, atol=1e-5)
+
+    def test_cache_info_for_resident_dem(self):
+        self.geospatial.find_elevation(np.array([-35.05, -35.06, -36.5]), np.array([149.05, 149.06, 149.05]))
+
+        cache_info = self.geospatial.cache_info()
+        self.assertEqual(cache_info["mode"], "resident")
+        self.assertEqual(cache_info["lookups"], 2)
+        self.assertEqual(cache_info["size_bytes"], self.geospatial.elevation_data.nbytes)
+
+
+class TestGEOSpatialTerrain(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dem_path = os.path.join(self.directory.name, "ramp.tif")
+
+        self.elevation = np.tile(100 + np.arange(360, dtype=np.float32), (360, 1))
+        write_dem(self.dem_path, self.elevation)
+
+        self.geospatial = GEOSpatial(self.dem_path)
+
+    def tearDown(self):
+        self.geospatial.src.close()
+        self.directory.cleanup()
+
+    def test_pyramid_bounds_terrain(self):
+        self.assertEqual(self.geospatial.pyramid[-1].shape, (1, 1))
+        self.assertEqual(self.geospatial.pyramid[-1][0, 0], self.elevation.max())
+        self.assertEqual(self.geospatial.pyramid[0][0, 0], 104)
+
+    def test_interpolate_elevation(self):
+        elevations = self.geospatial.interpolate_elevation(np.array([10.0, 20.25]), np.array([15.5, 40.75]))
+        np.testing.assert_allclose(elevations, [115.5, 140.75])
+
+    def test_find_target_location_on_slope(self):
+        drone_position = SimpleNamespace(latitude=-35.05, longitude=149.0 + 120.5 / 3600, altitude=250.0)
+        direction_vector = np.array([1.0, 0.0, 0.0])
+
+        latitude, longitude, altitude = self.geospatial.find_target_location(drone_position, direction_vector)
+
+        self.assertAlmostEqual(latitude, drone_position.latitude)
+        self.assertAlmostEqual((longitude - 149.0) * 3600 - 0.5, 150.0, delta=0.01)
+        self.assertAlmostEqual(altitude, 250.0, delta=0.01)
+
+
+class TestGEOSpatialHGT(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dem_path = os.path.join(self.directory.name, "S36E149.hgt")
+
+        self.elevation = (np.arange(1201 * 1201) % 1000).astype(">i2").reshape(1201, 1201)
+        self.elevation.tofile(self.dem_path)
+
+        self.geospatial = GEOSpatial(self.dem_path)
+
+    def tearDown(self):
+        self.geospatial.src.close()
+        self.directory.cleanup()
+
+    def test_elevation_memory_mapped(self):
+        self.assertIsInstance(self.geospatial.elevation_data, np.memmap)
+        self.assertTrue(self.geospatial.geographic)
+        np.testing.assert_array_equal(self.geospatial.elevation_data, self.geospatial.src.read(1))
+
+    def test_find_elevation_matches_raster_index(self):
+        latitudes = np.array([-35.2, -35.5, -35.95])
+        longitudes = np.array([149.1, 149.5, 149.99])
+
+        expected = [self.elevation[self.geospatial.src.index(lon, lat)] for lat, lon in zip(latitudes, longitudes)]
+
+        np.testing.assert_array_equal(self.geospatial.find_elevation(latitudes, longitudes), expected)
+
+    def test_cache_info_for_memory_mapped_dem(self):
+        self.geospatial.find_elevation(-35.2, 149.1)
+
+        self.assertEqual(self.geospatial.cache_info(), {"mode": "memmap", "lookups": 1, "size_bytes": 1201 * 1201 * 2})
+
+
+class TestGEOSpatialTileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dem_path = os.path.join(self.directory.name, "large.tif")
+
+        self.elevation = (np.arange(600 * 600) % 1000).astype(np.int16).reshape(600, 600)
+        write_dem(self.dem_path, self.elevation)
+
+        tile_bytes = 256 * 256 * 2
+        self.geospatial = GEOSpatial(self.dem_path, cache_size=2 * tile_bytes)
+
+    def tearDown(self):
+        self.geospatial.src.close()
+        self.directory.cleanup()
+
+    def test_find_elevation_through_tiles(self):
+        rows = np.array([10, 10, 300, 300, 599])
+        cols = np.array([10, 300, 10, 300, 599])
+        longitudes, latitudes = self.geospatial.src.xy(rows, cols)
+
+        elevations = self.geospatial.find_elevation(np.array(latitudes), np.array(longitudes))
+
+        np.testing.assert_array_equal(elevations, self.elevation[rows, cols])
+
+    def test_cache_info(self):
+        self.geospatial.find_elevation(-35.001, 149.001)
+        self.geospatial.find_elevation(-35.001, 149.001)
+        self.geospatial.find_elevation(-35.1, 149.001)
+        self.geospatial.find_elevation(-35.1, 149.1)
+
+        cache_info = self.geospatial.cache_info()
+        self.assertEqual(cache_info["mode"], "tiled")
+        self.assertEqual(cache_info["lookups"], 4)
+        self.assertEqual(cache_info["hits"], 1)
+        self.assertEqual(cache_info["misses"], 3)
+        self.assertEqual(cache_info["evictions"], 1)
+        self.assertLessEqual(cache_info["size_bytes"], cache_info["max_bytes"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from control.analysis.inference import SharedDetector, create_backend, decode_predictions, filter_detections, letterbox
+
+
+class TestLetterbox(unittest.TestCase):
+
+    def test_letterbox_keeps_aspect_ratio(self):
+        frame = np.full((480, 640, 3), 255, dtype=np.uint8)
+
+        image, scale, pad = letterbox(frame, 320)
+
+        self.assertEqual(image.shape, (320, 320, 3))
+        self.assertEqual(scale, 0.5)
+        self.assertEqual(pad, (0, 40))
+        self.assertEqual(image[0, 0, 0], 114)
+        self.assertEqual(image[160, 160, 0], 255)
+
+
+class TestDecodePredictions(unittest.TestCase):
+
+    def create_output(self, boxes):
+        # boxes as (cx, cy, w, h, score class 0, score class 1) in letterboxed pixels
+        return np.array(boxes, dtype=np.float32).T[np.newaxis]
+
+    def test_decode_maps_back_to_frame(self):
+        output = self.create_output([
+            [160, 160, 40, 20, 0.9, 0.1],
+            [162, 160, 40, 20, 0.8, 0.1],
+            [50, 100, 20, 20, 0.1, 0.6],
+            [200, 200, 20, 20, 0.1, 0.1]
+        ])
+
+        detections = decode_predictions(output, 0.5, (0, 40), (480, 640), conf=0.25, iou=0.5)
+
+        self.assertEqual(detections.shape, (2, 6))
+        np.testing.assert_allclose(detections[0], [280, 220, 360, 260, 0.9, 0], rtol=1e-6)
+        self.assertEqual(detections[1, 5], 1)
+
+    def test_decode_filters_classes_and_limit(self):
+        output = self.create_output([
+            [160, 160, 40, 20, 0.9, 0.1],
+            [50, 100, 20, 20, 0.1, 0.6],
+            [250, 250, 20, 20, 0.1, 0.7]
+        ])
+
+        self.assertEqual(len(decode_predictions(output, 1.0, (0, 0), (320, 320), classes=[1], max_det=1)), 1)
+        self.assertEqual(decode_predictions(output, 1.0, (0, 0), (320, 320), conf=0.95).shape, (0, 6))
+
+    def test_filter_detections(self):
+        detections = np.array([
+            [0, 0, 10, 10, 0.9, 0],
+            [0, 0, 10, 10, 0.2, 0],
+            [0, 0, 10, 10, 0.9, 2]
+        ])
+
+        self.assertEqual(len(filter_detections(detections, conf=0.5)), 2)
+        np.testing.assert_array_equal(filter_detections(detections, classes=[2], conf=0.5), detections[2:])
+
+
+class TestCreateBackend(unittest.TestCase):
+
+    @patch('control.analysis.inference.YOLO')
+    def test_warmup_uses_fixed_input_size(self, MockYOLO):
+        result = MagicMock()
+        result.boxes.data.cpu.return_value.numpy.return_value = np.empty((0, 6), dtype=np.float32)
+        MockYOLO.return_value.predict.return_value = [result]
+
+        backend = create_backend("ultralytics", "model.pt", input_size=320, warmup=2)
+
+        self.assertEqual(MockYOLO.return_value.predict.call_count, 2)
+        self.assertEqual(MockYOLO.return_value.predict.call_args.kwargs["imgsz"], 320)
+        self.assertIs(backend.names, MockYOLO.return_value.names)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend("tensorrt", "model.engine")
+
+
+class FakeBackend:
+    names = {0: "car"}
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, frames, classes=None, conf=0.25, iou=0.5, max_det=10):
+        self.batches.append(len(frames))
+        return [np.full((1, 6), frame) for frame in frames]
+
+
+class TestSharedDetector(unittest.TestCase):
+
+    def test_batches_concurrent_requests(self):
+        backend = FakeBackend()
+        detector = SharedDetector(backend, max_batch_size=3, batch_window=0.2)
+        results = {}
+
+        def request(value):
+            results[value] = detector.predict(value, conf=0.5)
+
+        threads = [threading.Thread(target=request, args=(value,)) for value in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(backend.batches, [3])
+        self.assertEqual({value: result[0, 0] for value, result in results.items()}, {0: 0, 1: 1, 2: 2})
+        self.assertIs(detector.names, backend.names)
+
+    def test_groups_by_options(self):
+        backend = FakeBackend()
+        detector = SharedDetector(backend, max_batch_size=1)
+
+        detector.predict(1, conf=0.5)
+        detector.predict(2, conf=0.7)
+
+        self.assertEqual(backend.batches, [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
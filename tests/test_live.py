@@ -0,0 +1,88 @@
+import json
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from control.encoding import FrameCache
+from tests.fixtures import create_analysis
+from utils.live import LiveFeed
+
+
+class TestLiveFeed(unittest.TestCase):
+
+    def setUp(self):
+        self.service = MagicMock()
+        self.service.class_name.return_value = "car"
+        self.frame_cache = FrameCache()
+        self.service.encode_frame.side_effect = self.frame_cache.encode
+
+        self.feed = LiveFeed(self.service, keepalive=0.05)
+
+    def test_subscribes_to_service(self):
+        self.service.subscribe.assert_called_once_with(self.feed.publish)
+
+    def test_frames_encode_once_for_all_viewers(self):
+        viewers = [self.feed.frames() for _ in range(3)]
+        self.feed.publish(create_analysis())
+
+        chunks = [next(viewer) for viewer in viewers]
+
+        self.assertEqual(self.frame_cache.info()["misses"], 1)
+        self.assertEqual(len(set(chunks)), 1)
+        self.assertTrue(chunks[0].startswith(b"--frame\r\nContent-Type: image/jpeg\r\n"))
+        self.assertIn(b"\xff\xd8", chunks[0])
+
+    def test_frames_wait_for_new_result(self):
+        viewer = self.feed.frames()
+        self.feed.publish(create_analysis(seconds=1, value=1))
+        next(viewer)
+
+        timer = threading.Timer(0.1, self.feed.publish, args=(create_analysis(seconds=2, value=2),))
+        timer.start()
+        next(viewer)
+        timer.join()
+
+        self.assertEqual(self.frame_cache.info()["misses"], 2)
+
+    def test_select_quality(self):
+        self.assertEqual(self.feed.select_quality(), (80, None))
+        self.assertEqual(self.feed.select_quality(quality=40), (40, None))
+
+        quality, controller = self.feed.select_quality("thumb", bitrate=100000)
+
+        self.assertEqual(quality, 80)
+        self.assertIs(self.feed.select_quality("thumb", bitrate=100000)[1], controller)
+
+    def test_frames_skip_missing_track(self):
+        viewer = self.feed.frames(track_id=8)
+        self.feed.publish(create_analysis(seconds=1, value=1))
+
+        tracked = create_analysis(seconds=2, value=2)
+        tracked["analysis"]["tracks"][0].update(track_id=8, frame={"x1": 0, "y1": 0, "x2": 10, "y2": 10})
+        timer = threading.Timer(0.1, self.feed.publish, args=(tracked,))
+        timer.start()
+        chunk = next(viewer)
+        timer.join()
+
+        self.assertTrue(chunk.startswith(b"--frame"))
+        self.assertEqual(self.feed.sequence, 2)
+        self.service.encode_frame.assert_called_with(tracked, "jpg", 80, "full", 8)
+
+    def test_events(self):
+        events = self.feed.events()
+
+        self.assertEqual(next(events), ": keepalive\n\n")
+
+        self.feed.publish(create_analysis())
+        event = next(events)
+
+        self.assertTrue(event.startswith("id: 1\ndata: "))
+        data = json.loads(event.split("data: ", 1)[1])
+        self.assertEqual(data["fps"], 12.3)
+        self.service.pipeline_info.assert_not_called()
+        self.assertEqual(data["tracks"][0]["class_name"], "car")
+        self.assertEqual(data["tracks"][0]["track_id"], "1")
+
+
+if __name__ == '__main__':
+    unittest.main()
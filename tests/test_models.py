@@ -1,4 +1,15 @@
+import os
+import tempfile
 import unittest
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask import Flask
+from flask_migrate import Migrate, upgrade
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from db import db
 from models.user import User
 from models.flight import Flight
 from models.detection import Detection
@@ -35,6 +46,10 @@ class TestFlightModel(unittest.TestCase):
         self.assertEqual(self.flight.user_id, 1)
         self.assertIsNotNone(self.flight.start_time)
 
+    def test_flight_stream(self):
+        flight = Flight(user_id=1, start_time=datetime.utcnow(), stream='alpha')
+        self.assertEqual(flight.stream, 'alpha')
+
     def test_flight_relationship(self):
         user = User(name='testuser', email='test@example.com')
         user.set_password('FlaskIsAwesome')
@@ -86,6 +101,13 @@ class TestImageModel(unittest.TestCase):
         self.assertEqual(self.image.fov_horizontal, 90.0)
         self.assertEqual(self.image.fov_vertical, 60.0)
 
+    def test_image_segment_reference(self):
+        image = Image(flight_snapshot_id=1, segment='flight-1/000000.seg', offset=1024, length=2048, width=640, height=480, fov_horizontal=90.0, fov_vertical=60.0)
+        self.assertIsNone(image.image)
+        self.assertEqual(image.segment, 'flight-1/000000.seg')
+        self.assertEqual(image.offset, 1024)
+        self.assertEqual(image.length, 2048)
+
 
 class TestObjectModel(unittest.TestCase):
 
@@ -131,5 +153,61 @@ class TestTaskModel(unittest.TestCase):
         self.assertEqual(self.task.status, 0)
 
 
+class TestSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.directory.name, 'app.db')}"
+        db.init_app(self.app)
+        Migrate(self.app, db, directory=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations'))
+
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        self.directory.cleanup()
+
+    def test_migrations_match_models(self):
+        upgrade()
+
+        with db.engine.connect() as connection:
+            self.assertEqual(compare_metadata(MigrationContext.configure(connection), db.metadata), [])
+
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('detection')}
+        self.assertIn('ix_detection_object_id_id', indexes)
+
+    def test_upgrade_from_baseline(self):
+        upgrade(revision='0001')
+        db.session.execute(text("INSERT INTO flight (id, user_id, start_time) VALUES (1, 1, '2024-05-01 12:00:00')"))
+        db.session.commit()
+
+        upgrade()
+
+        self.assertEqual(db.session.get(Flight, 1).stream, 'default')
+        self.assertTrue(inspect(db.engine).get_columns('image')[2]['nullable'])
+        self.assertIn('segment', {column['name'] for column in inspect(db.engine).get_columns('image')})
+
+    def test_unique_flight_keys(self):
+        db.create_all()
+        db.session.add(Object(flight_id=1, track_id=5))
+        db.session.add(Object(flight_id=2, track_id=5))
+        db.session.commit()
+
+        db.session.add(Object(flight_id=1, track_id=5))
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+        db.session.add_all([Setting(flight_id=1, parameter='confidence', value='0.5'),
+                            Setting(flight_id=1, parameter='confidence', value='0.7')])
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+
+
 if __name__ == '__main__':
     unittest.main()
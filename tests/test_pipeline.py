@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+import unittest
+
+from control.pipeline import Stage, put_latest, rate
+
+
+class TestPutLatest(unittest.TestCase):
+
+    def test_drops_oldest(self):
+        target = queue.Queue(maxsize=2)
+
+        self.assertEqual(put_latest(target, 1), 0)
+        self.assertEqual(put_latest(target, 2), 0)
+        self.assertEqual(put_latest(target, 3), 1)
+
+        self.assertEqual([target.get_nowait(), target.get_nowait()], [2, 3])
+
+
+class TestStage(unittest.TestCase):
+
+    def test_process_forwards_result(self):
+        output_queue = queue.Queue(maxsize=1)
+        stage = Stage("double", lambda value: value * 2, output_queue=output_queue)
+
+        self.assertEqual(stage.process(2), 4)
+        stage.process(3)
+
+        self.assertEqual(output_queue.get_nowait(), 6)
+        self.assertEqual(stage.info()["processed"], 2)
+        self.assertEqual(stage.info()["dropped"], 1)
+
+    def test_process_skips_empty_result(self):
+        output_queue = queue.Queue(maxsize=1)
+        stage = Stage("empty", lambda: None, output_queue=output_queue)
+
+        stage.process()
+
+        self.assertTrue(output_queue.empty())
+        self.assertEqual(stage.info()["skipped"], 1)
+        self.assertEqual(stage.info()["processed"], 0)
+
+    def test_run_counts_failures(self):
+        input_queue = queue.Queue()
+        output_queue = queue.Queue()
+        stage = Stage("inverse", lambda value: 1 / value, input_queue, output_queue)
+        stage.start()
+
+        input_queue.put(0)
+        input_queue.put(4)
+
+        self.assertEqual(output_queue.get(timeout=1), 0.25)
+        self.assertEqual(stage.info()["failed"], 1)
+        self.assertEqual(stage.info()["processed"], 1)
+
+    def test_source_waits_for_run_event(self):
+        run_event = threading.Event()
+        output_queue = queue.Queue()
+        values = iter(range(100))
+        stage = Stage("source", lambda: next(values), output_queue=output_queue, run_event=run_event)
+        stage.start()
+
+        with self.assertRaises(queue.Empty):
+            output_queue.get(timeout=0.1)
+
+        run_event.set()
+        self.assertEqual(output_queue.get(timeout=1), 0)
+
+        run_event.clear()
+        stage.stop()
+        self.assertFalse(stage.thread.is_alive())
+
+    def test_failures_back_off_on_one_thread(self):
+        run_event = threading.Event()
+        run_event.set()
+        calls = []
+
+        def failing():
+            calls.append(threading.current_thread())
+            raise RuntimeError("no frame")
+
+        stage = Stage("source", failing, run_event=run_event, backoff=0.05, max_backoff=0.2)
+        stage.start()
+        stage.start()
+
+        threading.Event().wait(0.3)
+        stage.stop()
+
+        self.assertEqual(len(set(calls)), 1)
+        self.assertLessEqual(stage.info()["failed"], 4)
+        self.assertGreaterEqual(stage.info()["failed"], 2)
+
+    def test_backoff_resets_after_success(self):
+        run_event = threading.Event()
+        run_event.set()
+        outcomes = iter([False, False, False, True, False])
+        calls = []
+
+        def flaky():
+            calls.append(time.monotonic())
+            if not next(outcomes, True):
+                raise RuntimeError("no frame")
+            return 1
+
+        stage = Stage("source", flaky, run_event=run_event, backoff=0.05, max_backoff=1.0)
+        stage.start()
+
+        threading.Event().wait(0.6)
+        run_event.clear()
+        stage.stop()
+
+        self.assertEqual(stage.info()["failed"], 4)
+        self.assertLess(calls[5] - calls[4], 0.15)
+
+    def test_idle_source_waits_between_polls(self):
+        run_event = threading.Event()
+        run_event.set()
+        calls = []
+
+        def empty():
+            calls.append(time.monotonic())
+            return None
+
+        stage = Stage("source", empty, run_event=run_event, idle=0.02, max_idle=0.08)
+        stage.start()
+
+        threading.Event().wait(0.3)
+        run_event.clear()
+        stage.stop()
+
+        self.assertLessEqual(len(calls), 8)
+        self.assertEqual(stage.info()["skipped"], len(calls))
+        self.assertGreaterEqual(calls[-1] - calls[-2], 0.07)
+
+    def test_rate(self):
+        self.assertEqual(rate([]), 0.0)
+        self.assertEqual(rate([1.0, 1.5, 2.0]), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import threading
+import unittest
+from datetime import datetime
+from multiprocessing import Pipe
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from control.process import RemoteStreamManager, SharedFrames, decode_result, encode_result, serve_commands
+
+
+def create_result(frame):
+    return {
+        "timestamp": datetime.now(),
+        "drone": {"camera": {"frame": frame, "width": frame.shape[1], "height": frame.shape[0]}},
+        "analysis": {"tracks": [{"track_id": 1}], "frame": frame}
+    }
+
+
+class TestSharedFrames(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = SharedFrames(slots=2, slot_size=64 * 48 * 3)
+        self.reader = SharedFrames(slots=2, slot_size=64 * 48 * 3, name=self.frames.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.frames.close()
+
+    def test_round_trip(self):
+        frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+
+        location = self.frames.write(frame)
+
+        np.testing.assert_array_equal(self.reader.read(*location), frame)
+
+    def test_overwritten_slot_is_discarded(self):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+        location = self.frames.write(frame)
+        self.frames.write(frame)
+        self.frames.write(frame)
+
+        self.assertIsNone(self.reader.read(*location))
+
+    def test_oversized_frame(self):
+        self.assertIsNone(self.frames.write(np.zeros((480, 640, 3), dtype=np.uint8)))
+
+    def test_result_round_trip(self):
+        frame = np.ones((48, 64, 3), dtype=np.uint8)
+
+        message, location = encode_result(create_result(frame), self.frames)
+        self.assertIsNone(message["analysis"]["frame"])
+        self.assertIsNone(message["drone"]["camera"]["frame"])
+
+        result = decode_result(message, location, self.reader)
+
+        np.testing.assert_array_equal(result["analysis"]["frame"], frame)
+        self.assertIs(result["drone"]["camera"]["frame"], result["analysis"]["frame"])
+        self.assertEqual(result["analysis"]["tracks"], [{"track_id": 1}])
+
+    def test_result_falls_back_to_inline_frame(self):
+        frame = np.ones((480, 640, 3), dtype=np.uint8)
+
+        message, location = encode_result(create_result(frame), self.frames)
+
+        self.assertIsNone(location)
+        self.assertIs(decode_result(message, location, self.reader)["analysis"]["frame"], frame)
+
+
+class TestServeCommands(unittest.TestCase):
+
+    def test_dispatches_to_stream(self):
+        manager = MagicMock()
+        manager.get.return_value.execute_command.return_value = "SUCCESS"
+        manager.get.return_value.update_settings.side_effect = ValueError("bad setting")
+
+        connection, worker = Pipe()
+        thread = threading.Thread(target=serve_commands, args=(manager, worker))
+        thread.start()
+
+        connection.send(("alpha", "execute_command", ({"COMMAND": "ARM"},), {}))
+        self.assertEqual(connection.recv(), ("ok", "SUCCESS"))
+
+        connection.send(("alpha", "update_settings", (), {"detection_threshold": 2}))
+        self.assertEqual(connection.recv(), ("error", "ValueError: bad setting"))
+
+        connection.send(None)
+        thread.join()
+
+        manager.get.assert_called_with("alpha")
+
+
+class TestRemoteStreamManager(unittest.TestCase):
+
+    def test_worker_failing_at_startup(self):
+        with self.assertRaises(RuntimeError):
+            RemoteStreamManager(
+                {"alpha": {}}, slot_size=16, startup_timeout=60,
+                model_path="missing.pt", inference_backend="missing"
+            )
+
+    def test_call_after_worker_exit(self):
+        manager = RemoteStreamManager.__new__(RemoteStreamManager)
+        manager.command_connection, worker = Pipe()
+        manager.command_lock = threading.Lock()
+        manager.process = MagicMock(exitcode=1)
+        worker.close()
+
+        with self.assertRaises(RuntimeError):
+            manager.call("alpha", "pipeline_info")
+
+        self.assertFalse(manager.command_lock.locked())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from control.analysis.reid import BatchedExtractor, SharedExtractor, box_iou
+
+
+class FakeExtractor:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, crops):
+        self.batches.append(len(crops))
+        return np.array([[crop, 1.0] for crop in crops], dtype=np.float32)
+
+
+def create_track(track_id, box, confirmed=True):
+    track = MagicMock()
+    track.track_id = track_id
+    track.to_tlbr.return_value = box
+    track.is_confirmed.return_value = confirmed
+    track.time_since_update = 0
+    return track
+
+
+class TestBoxIou(unittest.TestCase):
+
+    def test_box_iou(self):
+        overlaps = box_iou([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+
+        np.testing.assert_allclose(overlaps, [[1.0, 1 / 3, 0.0]])
+
+
+class TestBatchedExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeExtractor()
+
+    def test_single_forward_pass_per_frame(self):
+        extractor = BatchedExtractor(self.fake, max_batch_size=32)
+
+        features = extractor(list(range(10)))
+
+        self.assertEqual(self.fake.batches, [10])
+        self.assertEqual(features.shape, (10, 2))
+
+    def test_batches_are_capped(self):
+        extractor = BatchedExtractor(self.fake, max_batch_size=4)
+
+        extractor(list(range(10)))
+
+        self.assertEqual(self.fake.batches, [4, 4, 2])
+
+    def test_reuses_features_for_still_confirmed_tracks(self):
+        extractor = BatchedExtractor(self.fake, reuse_iou=0.9)
+        detections = np.array([[0, 0, 10, 10, 0.9, 0], [50, 50, 60, 60, 0.9, 0]])
+
+        extractor.prime(detections)
+        extractor([1.0, 2.0])
+        extractor.remember([create_track(1, [0, 0, 10, 10]), create_track(2, [50, 50, 60, 60], confirmed=False)])
+
+        moved = np.array([[0, 0, 10, 10.2, 0.9, 0], [50, 50, 60, 60, 0.9, 0]])
+        extractor.prime(moved)
+        features = extractor([3.0, 4.0])
+
+        self.assertEqual(self.fake.batches, [2, 1])
+        np.testing.assert_array_equal(features[:, 0], [1.0, 4.0])
+        self.assertEqual(extractor.skipped, 1)
+
+    def test_no_reuse_by_default(self):
+        extractor = BatchedExtractor(self.fake)
+        detections = np.array([[0, 0, 10, 10, 0.9, 0]])
+
+        for _ in range(2):
+            extractor.prime(detections)
+            extractor([1.0])
+            extractor.remember([create_track(1, [0, 0, 10, 10])])
+
+        self.assertEqual(self.fake.batches, [1, 1])
+
+
+class TestSharedExtractor(unittest.TestCase):
+
+    def test_streams_share_one_model(self):
+        fake = FakeExtractor()
+        shared = SharedExtractor(fake)
+        alpha, bravo = BatchedExtractor(shared), BatchedExtractor(shared)
+
+        alpha([1.0, 2.0])
+        bravo([3.0])
+
+        self.assertEqual(fake.batches, [2, 1])
+        self.assertIs(alpha.batches, fake.batches)
+
+
+if __name__ == '__main__':
+    unittest.main()
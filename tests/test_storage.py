@@ -0,0 +1,318 @@
+import queue
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from flask import Flask
+
+from control.encoding import FrameCache
+from db import db
+from models import Detection, Flight, FlightSnapshot, Image, Object, Point, User
+from storage import AnalysisWriter, SegmentStore, flight_path, store_analyses
+from tests.fixtures import create_analysis
+
+
+class TestAnalysisWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+
+        user = User(name='pilot', email='pilot@example.com')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Flight(user_id=user.id, start_time=datetime.now(), stream='alpha'))
+        db.session.commit()
+
+        self.frame_cache = FrameCache()
+        self.stream_manager = MagicMock()
+        self.stream_manager.get.return_value.encode_frame.side_effect = self.frame_cache.encode
+        self.writer = AnalysisWriter(self.app, self.stream_manager, queue_size=2, flush_interval=0.05)
+        self.writer.refresh()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def write(self, *items):
+        self.writer.write([(stream, analysis, self.frame_cache.encode(analysis)) for stream, analysis in items])
+
+    def test_write_stores_analysis(self):
+        self.write(('alpha', create_analysis()))
+
+        self.assertEqual(FlightSnapshot.query.count(), 1)
+        self.assertEqual(Image.query.count(), 1)
+        self.assertEqual(Point.query.count(), 3)
+        self.assertEqual(Object.query.count(), 2)
+        self.assertEqual(Detection.query.count(), 2)
+        self.assertEqual(self.writer.info()["written"], 1)
+
+    def test_write_reuses_objects(self):
+        self.write(('alpha', create_analysis()))
+        self.write(('alpha', create_analysis(track_ids=(2, 3), seconds=1)))
+
+        self.assertEqual(Object.query.count(), 3)
+        self.assertEqual(Detection.query.count(), 4)
+
+    def test_write_batch(self):
+        self.write(('alpha', create_analysis()), ('bravo', create_analysis()), ('alpha', create_analysis((2, 5), seconds=1)))
+
+        self.assertEqual(FlightSnapshot.query.count(), 2)
+        self.assertEqual(Detection.query.count(), 4)
+        self.assertEqual(Object.query.count(), 3)
+        self.assertEqual(self.writer.info()["batches"], 1)
+        self.assertEqual(self.writer.info()["skipped"], 1)
+
+        detection = Detection.query.join(Object).filter(Object.track_id == 5).one()
+        self.assertEqual(detection.point.altitude, 90.0)
+        self.assertEqual(detection.image.flight_snapshot.point.altitude, 100.0)
+        self.assertEqual(self.writer.object_ids[(1, 5)], detection.object_id)
+
+    def test_object_ids_loaded_once_per_flight(self):
+        db.session.add(Object(flight_id=1, track_id=1))
+        db.session.commit()
+
+        self.write(('alpha', create_analysis()))
+        self.assertEqual(Object.query.count(), 2)
+
+        self.assertEqual(store_analyses([(1, create_analysis((1, 2), seconds=1))], self.writer.object_ids, self.writer.loaded_flights), {})
+        db.session.commit()
+        self.assertEqual(Object.query.count(), 2)
+
+    def test_write_to_segment_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SegmentStore(directory)
+            self.writer.segment_store = store
+
+            self.write(('alpha', create_analysis()), ('alpha', create_analysis(seconds=1)))
+
+            images = Image.query.order_by(Image.id).all()
+            self.assertIsNone(images[0].image)
+            self.assertEqual(images[0].segment, images[1].segment)
+            self.assertEqual(images[1].offset, images[0].length)
+            self.assertEqual(bytes(store.read_image(images[1]))[:2], b'\xff\xd8')
+
+            store.close()
+
+    def test_submit_reuses_shared_encoding(self):
+        analysis = create_analysis()
+        encoded = self.frame_cache.encode(analysis)
+
+        self.writer.submit('alpha', analysis)
+        for seconds in range(1, 6):
+            self.frame_cache.encode(create_analysis(seconds=seconds))
+        item = self.writer.results.get()
+        self.writer.write([item])
+
+        self.assertIsNone(item[1]["analysis"]["frame"])
+        self.assertIsNone(item[1]["drone"]["camera"]["frame"])
+        self.assertIsNotNone(analysis["analysis"]["frame"])
+        self.assertEqual(Image.query.one().image, encoded)
+        self.assertEqual(self.frame_cache.info()["misses"], 6)
+
+    def test_submit_skips_streams_without_flight(self):
+        self.writer.submit('bravo', create_analysis())
+
+        self.assertEqual(self.writer.info()["pending"], 0)
+        self.assertEqual(self.writer.info()["skipped"], 1)
+        self.stream_manager.get.return_value.encode_frame.assert_not_called()
+
+    def test_first_write_loads_recording_streams(self):
+        self.writer.recording = None
+
+        self.write(('alpha', create_analysis()))
+
+        self.assertEqual(self.writer.recording, {'alpha'})
+
+    def test_write_to_every_active_flight(self):
+        db.session.add(Flight(user_id=1, start_time=datetime.now(), stream='alpha'))
+        db.session.commit()
+
+        self.write(('alpha', create_analysis()))
+
+        self.assertEqual(FlightSnapshot.query.count(), 2)
+        self.assertEqual(Object.query.count(), 4)
+        self.assertEqual(self.writer.info()["written"], 2)
+
+    def test_write_without_active_flight(self):
+        self.write(('bravo', create_analysis()))
+
+        self.assertEqual(FlightSnapshot.query.count(), 0)
+        self.assertEqual(self.writer.info()["skipped"], 1)
+
+    def test_write_skips_tracks_without_location(self):
+        analysis = create_analysis()
+        analysis["analysis"]["tracks"][1]["location"] = {"latitude": None, "longitude": None, "altitude": None}
+
+        self.write(('alpha', analysis))
+
+        self.assertEqual(FlightSnapshot.query.count(), 1)
+        self.assertEqual(Point.query.count(), 2)
+        self.assertEqual(Object.query.count(), 1)
+        self.assertEqual(Detection.query.count(), 1)
+
+    def test_failed_write_rolls_back(self):
+        analysis = create_analysis()
+        del analysis["analysis"]["tracks"][1]["location"]
+
+        self.write(('alpha', analysis))
+
+        self.assertEqual(FlightSnapshot.query.count(), 0)
+        self.assertEqual(Point.query.count(), 0)
+        self.assertEqual(self.writer.info()["failed"], 1)
+
+    def test_submit_drops_when_full(self):
+        for _ in range(3):
+            self.writer.submit('alpha', create_analysis())
+
+        self.assertEqual(self.writer.info()["pending"], 2)
+        self.assertEqual(self.writer.info()["dropped"], 1)
+
+    def test_collect_flushes_by_count(self):
+        self.writer.flush_count = 2
+        self.writer.results = queue.Queue()
+        for _ in range(3):
+            self.writer.submit('alpha', create_analysis())
+
+        batch, stopped = self.writer.collect()
+
+        self.assertEqual(len(batch), 2)
+        self.assertFalse(stopped)
+
+    def test_start_subscribes_to_streams(self):
+        self.stream_manager.names.return_value = ['alpha']
+
+        self.writer.start()
+        self.stream_manager.get.return_value.subscribe.assert_called_once()
+
+        self.writer.stop()
+
+
+class TestSegmentStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SegmentStore(self.directory.name, segment_size=10)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_append_and_read(self):
+        first = self.store.append(1, b'abcdef')
+        second = self.store.append(1, b'ghi')
+        self.store.flush()
+
+        self.assertEqual(first, ('flight-1/000000.seg', 0, 6))
+        self.assertEqual(second, ('flight-1/000000.seg', 6, 3))
+        self.assertEqual(self.store.read(*first), b'abcdef')
+        self.assertEqual(self.store.read(*second), b'ghi')
+
+    def test_rolls_over_segments(self):
+        self.store.append(1, b'abcdef')
+        location = self.store.append(1, b'ghijkl')
+        self.store.flush()
+
+        self.assertEqual(location, ('flight-1/000001.seg', 0, 6))
+        self.assertEqual(self.store.read(*location), b'ghijkl')
+
+    def test_read_remaps_growing_segment(self):
+        first = self.store.append(2, b'abc')
+        self.store.flush()
+        self.assertEqual(self.store.read(*first), b'abc')
+
+        second = self.store.append(2, b'def')
+        self.store.flush()
+        self.assertEqual(self.store.read(*second), b'def')
+
+    def test_resumes_last_segment(self):
+        self.store.append(1, b'abcdef')
+        self.store.append(1, b'ghijkl')
+        self.store.close()
+
+        store = SegmentStore(self.directory.name, segment_size=10)
+        self.assertEqual(store.append(1, b'mn'), ('flight-1/000001.seg', 6, 2))
+        store.close()
+
+    def test_close_flight(self):
+        first = self.store.append(1, b'abc')
+        self.store.append(2, b'def')
+        self.store.flush()
+        self.store.read(*first)
+
+        file = self.store.active[1][2]
+        self.store.close_flight(1)
+
+        self.assertTrue(file.closed)
+        self.assertEqual(list(self.store.active), [2])
+        self.assertEqual(self.store.maps, {})
+        self.assertEqual(self.store.append(1, b'gh'), ('flight-1/000000.seg', 3, 2))
+
+    def test_read_inline_image(self):
+        image = Image(image=b'jpeg', segment=None)
+
+        self.assertEqual(self.store.read_image(image), b'jpeg')
+
+
+class TestFlightPath(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+
+        self.start = datetime(2024, 5, 1, 12, 0, 0)
+        for flight_id in (1, 2):
+            for second in range(0, 180, 20):
+                point = Point(latitude=50.0 + second, longitude=30.0, altitude=100.0)
+                db.session.add(point)
+                db.session.flush()
+                db.session.add(FlightSnapshot(
+                    timestamp=self.start + timedelta(seconds=second, microseconds=flight_id), flight_id=flight_id,
+                    point_id=point.id, roll=0.0, pitch=0.0, yaw=float(second),
+                    gimbal_roll=0.0, gimbal_pitch=0.0, gimbal_yaw=0.0
+                ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def test_one_snapshot_per_minute(self):
+        path = flight_path(1)
+
+        self.assertEqual([snapshot['heading'] for snapshot in path], [0.0, 60.0, 120.0])
+        self.assertEqual(path[1], {
+            'timestamp': (self.start + timedelta(seconds=60, microseconds=1)).isoformat(),
+            'latitude': 110.0,
+            'longitude': 30.0,
+            'altitude': 100.0,
+            'heading': 60.0
+        })
+
+    def test_since_returns_newer_buckets(self):
+        path = flight_path(1)
+
+        self.assertEqual(flight_path(1, datetime.fromisoformat(path[0]['timestamp'])), path[1:])
+        self.assertEqual(flight_path(1, self.start + timedelta(seconds=90)), path[2:])
+        self.assertEqual(flight_path(1, datetime.fromisoformat(path[-1]['timestamp'])), [])
+
+    def test_unknown_flight(self):
+        self.assertEqual(flight_path(3), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+
+from control.streams import StreamManager, parse_streams
+
+
+class TestParseStreams(unittest.TestCase):
+
+    def test_default_stream(self):
+        default = {"stream_host": "localhost", "stream_port": 5588}
+
+        self.assertEqual(parse_streams(None, default), {"default": default})
+
+    def test_streams_override_defaults(self):
+        streams = parse_streams(
+            '{"alpha": {"stream_port": 5588}, "bravo": {"stream_port": 5589}}',
+            {"stream_host": "localhost", "stream_port": 5000}
+        )
+
+        self.assertEqual(list(streams), ["alpha", "bravo"])
+        self.assertEqual(streams["bravo"], {"stream_host": "localhost", "stream_port": 5589})
+
+
+class TestStreamManager(unittest.TestCase):
+
+    @patch('control.streams.DroneCoreService')
+    @patch('control.streams.create_extractor')
+    @patch('control.streams.SharedDetector')
+    @patch('control.streams.create_backend')
+    def setUp(self, mock_create_backend, MockSharedDetector, mock_create_extractor, MockDroneCoreService):
+        self.mock_create_backend = mock_create_backend
+        self.mock_create_extractor = mock_create_extractor
+        self.MockSharedDetector = MockSharedDetector
+        self.MockDroneCoreService = MockDroneCoreService
+
+        self.manager = StreamManager(
+            streams={
+                "alpha": {"mavlink_address": "udp:0.0.0.0:14550", "stream_port": 5588},
+                "bravo": {"mavlink_address": "udp:0.0.0.0:14560", "stream_port": 5589}
+            },
+            model_path="control/analysis/yolov8n-visdrone.pt",
+            dem_path="control/analysis/S36E149.hgt"
+        )
+
+    def test_one_model_shared_by_streams(self):
+        self.mock_create_backend.assert_called_once()
+        self.mock_create_extractor.assert_called_once_with(32)
+        self.assertEqual(self.MockSharedDetector.call_args.kwargs["max_batch_size"], 2)
+        self.assertEqual(self.MockDroneCoreService.call_count, 2)
+
+        for call in self.MockDroneCoreService.call_args_list:
+            self.assertIs(call.kwargs["model"], self.manager.detector)
+            self.assertIs(call.kwargs["reid_extractor"], self.manager.extractor)
+            self.assertEqual(call.kwargs["dem_path"], "control/analysis/S36E149.hgt")
+
+        self.assertEqual(self.MockDroneCoreService.call_args.kwargs["stream_port"], 5589)
+
+    def test_get(self):
+        self.assertEqual(self.manager.names(), ["alpha", "bravo"])
+        self.assertIs(self.manager.get(), self.manager.services["alpha"])
+        self.assertIs(self.manager.get("bravo"), self.manager.services["bravo"])
+
+        with self.assertRaises(KeyError):
+            self.manager.get("charlie")
+
+
+if __name__ == '__main__':
+    unittest.main()
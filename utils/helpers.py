@@ -5,7 +5,9 @@ import random
 import base64
 from io import BytesIO
 from PIL import Image
-from flask import session, jsonify
+from flask import current_app, session, jsonify
+
+from models import Flight
 
 
 def convert_image_to_base64(img_array):
@@ -35,3 +37,13 @@ def flight_active_required(f):
             return jsonify({'error': 'No active flight. Start a flight first.'}), 403
         return f(*args, **kwargs)
     return decorated_function
+
+
+def flight_stream(flight_id):
+    flight = Flight.query.get(flight_id)
+
+    return flight.stream if flight else current_app.stream_manager.default
+
+
+def flight_core_service(flight_id):
+    return current_app.stream_manager.get(flight_stream(flight_id))
@@ -0,0 +1,115 @@
+import json
+import threading
+
+from control.encoding import DEFAULT_QUALITY, AdaptiveQuality
+
+
+def track_metadata(service, analysis):
+    return {
+        "timestamp": analysis["timestamp"].isoformat(),
+        "fps": round(analysis["fps"], 1),
+        "tracks": [{
+            "track_id": str(track["track_id"]),
+            "class_name": str(service.class_name(track["class_id"])),
+            "latitude": str(track["location"]["latitude"]),
+            "longitude": str(track["location"]["longitude"]),
+            "altitude": str(track["location"]["altitude"])
+        } for track in analysis["analysis"]["tracks"]]
+    }
+
+
+class LiveFeed:
+    def __init__(self, service, quality=DEFAULT_QUALITY, keepalive=15.0, max_controllers=32):
+        self.service = service
+        self.quality = quality
+        self.keepalive = keepalive
+
+        self.condition = threading.Condition()
+        self.sequence = 0
+        self.analysis = None
+
+        self.encode_lock = threading.Lock()
+        self.encoded = None
+
+        self.controllers = {}
+        self.max_controllers = max_controllers
+
+        service.subscribe(self.publish)
+
+    def publish(self, analysis):
+        with self.condition:
+            self.analysis = analysis
+            self.sequence += 1
+            self.condition.notify_all()
+
+    def wait(self, last_sequence, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence > last_sequence, timeout)
+
+            return self.sequence, self.analysis
+
+    def metadata(self, sequence, analysis):
+        with self.encode_lock:
+            if self.encoded is None or self.encoded[0] != sequence:
+                self.encoded = (sequence, json.dumps(track_metadata(self.service, analysis)))
+
+            return self.encoded[1]
+
+    def select_quality(self, rendition="full", track_id=None, quality=None, bitrate=None):
+        if quality is not None or not bitrate:
+            return quality or self.quality, None
+
+        key = (rendition, track_id, bitrate)
+        with self.encode_lock:
+            controller = self.controllers.get(key)
+            if controller is None:
+                if len(self.controllers) >= self.max_controllers:
+                    self.controllers.pop(next(iter(self.controllers)))
+                controller = self.controllers[key] = AdaptiveQuality(bitrate, quality=self.quality)
+
+        return controller.quality, controller
+
+    def encode(self, analysis, rendition="full", track_id=None, quality=None, bitrate=None):
+        quality, controller = self.select_quality(rendition, track_id, quality, bitrate)
+        data = self.service.encode_frame(analysis, "jpg", quality, rendition, track_id)
+
+        if controller is not None:
+            with self.encode_lock:
+                controller.update(analysis["timestamp"], len(data))
+
+        return data
+
+    def frames(self, rendition="full", track_id=None, quality=None, bitrate=None):
+        last_sequence = 0
+        while True:
+            sequence, analysis = self.wait(last_sequence, self.keepalive)
+            if sequence == last_sequence:
+                continue
+            last_sequence = sequence
+
+            try:
+                jpeg = self.encode(analysis, rendition, track_id, quality, bitrate)
+            except KeyError:
+                continue
+            yield (
+                b"--frame\r\n"
+                b"Content-Type: image/jpeg\r\n"
+                + f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                + jpeg
+                + b"\r\n"
+            )
+
+    def events(self):
+        last_sequence = 0
+        while True:
+            sequence, analysis = self.wait(last_sequence, self.keepalive)
+            if sequence == last_sequence:
+                yield ": keepalive\n\n"
+                continue
+            last_sequence = sequence
+
+            yield f"id: {sequence}\ndata: {self.metadata(sequence, analysis)}\n\n"
+
+
+def create_live_feeds(stream_manager, quality=DEFAULT_QUALITY):
+    return {name: LiveFeed(stream_manager.get(name), quality=quality) for name in stream_manager.names()}